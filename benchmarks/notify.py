@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from asyncio import get_running_loop, run, sleep
+from datetime import datetime, timezone
+from itertools import cycle
+from pathlib import Path
+from statistics import median, quantiles
+from tempfile import TemporaryDirectory
+from time import perf_counter, perf_counter_ns
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.const import CONF_ADDRESS, CONF_NAME  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import device_registry  # noqa: E402
+
+import custom_components.sony_mesh as mesh  # noqa: E402
+from custom_components.sony_mesh import binary_sensor, sensor  # noqa: E402
+from simulator import create_block  # noqa: E402
+
+MIXES = {
+    "mixed": ("AC", "BU", "GP", "LE", "MD", "PA", "TH"),
+    "sensors": ("PA", "TH"),
+    "gp": ("GP",),
+    "buttons": ("AC", "BU"),
+}
+
+_PLATFORMS = (binary_sensor, sensor)
+
+
+class LoopBusyTimer:
+    def __init__(self):
+        self.selector = get_running_loop()._selector
+        self.idle = 0.0
+        self.busy = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        self.select = self.selector.select
+        self.selector.select = self.__select
+        return self
+
+    def __exit__(self, *exc):
+        self.selector.select = self.select
+        self.busy = perf_counter() - self.start - self.idle
+
+    def __select(self, timeout=None):
+        start = perf_counter()
+        try:
+            return self.select(timeout)
+        finally:
+            self.idle += perf_counter() - start
+
+
+async def build_fleet(hass: HomeAssistant, mix: str, size: int, packets: int):
+    fleet = []
+    codes = cycle(MIXES[mix])
+    for i in range(size):
+        code = next(codes)
+        name = f"MESH-100{code}{i:07d}"
+        entry = SimpleNamespace(
+            data={CONF_ADDRESS: name, CONF_NAME: name},
+            entry_id=name,
+            options={},
+        )
+        model = mesh.get_model(name)
+        core = model.core(hass, entry, model)
+        hass.data[entry.entry_id] = core
+        entities = []
+        for module in _PLATFORMS:
+            await module.async_setup_entry(hass, entry, entities.extend)
+        for n, entity in enumerate(entities):
+            entity.hass = hass
+            entity.entity_id = f"sensor.bench_{i}_{n}"
+            await entity.async_added_to_hass()
+        block = create_block(name, seed=i)
+        stream: list[bytearray] = []
+        block.emit = lambda channel, data: stream.append(bytearray(data))
+        block.connected()
+        block.write(mesh.CMD_FEATURE_ENABLE)
+        block.write(mesh.add_checksum(b"\x01\x00\x00"))
+        while len(stream) < packets:
+            block.tick()
+        fleet.append((core, stream[:packets]))
+    return fleet
+
+
+def interleave(fleet):
+    streams = [(core._received, stream) for core, stream in fleet]
+    for i in range(max(len(x[1]) for x in streams)):
+        for received, stream in streams:
+            if i < len(stream):
+                yield received, stream[i]
+
+
+async def measure(hass: HomeAssistant, mix: str, size: int, packets: int):
+    fleet = await build_fleet(hass, mix, size, packets)
+    work = list(interleave(fleet))
+    await sleep(0)
+
+    latencies = []
+
+    def deliver(received, data):
+        start = perf_counter_ns()
+        received(None, data)
+        latencies.append(perf_counter_ns() - start)
+
+    loop = get_running_loop()
+    wall = perf_counter()
+    with LoopBusyTimer() as timer:
+        for received, data in work:
+            loop.call_soon(deliver, received, data)
+        await hass.async_block_till_done()
+    wall = perf_counter() - wall
+
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    for received, data in work:
+        received(None, data)
+    await hass.async_block_till_done()
+    _, peak = tracemalloc.get_traced_memory()
+    blocks = sys.getallocatedblocks() - blocks
+    tracemalloc.stop()
+
+    for core, _ in fleet:
+        core.close()
+        hass.data.pop(core.entry_id)
+    pct = quantiles(latencies, n=100)
+    return {
+        "mix": mix,
+        "blocks": size,
+        "packets": len(work),
+        "packets_per_second": round(len(work) / wall, 1),
+        "latency_us": {
+            "p50": round(median(latencies) / 1000, 2),
+            "p95": round(pct[94] / 1000, 2),
+            "p99": round(pct[98] / 1000, 2),
+            "max": round(max(latencies) / 1000, 2),
+        },
+        "loop_seconds": round(timer.busy, 4),
+        "alloc_peak_bytes": peak,
+        "retained_blocks": blocks,
+    }
+
+
+async def run_suite(mixes: list[str], sizes: list[int], packets: int):
+    with TemporaryDirectory() as config_dir:
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+        await device_registry.async_load(hass)
+        hass.data[mesh.DOMAIN] = mesh.MESHConnectScheduler()
+        results = []
+        for mix in mixes:
+            for size in sizes:
+                results.append(await measure(hass, mix, size, packets))
+                print(json.dumps(results[-1]), file=sys.stderr)
+        await hass.async_stop(force=True)
+    return results
+
+
+def revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, check=True, text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path: str, new_path: str):
+    old = {(x["mix"], x["blocks"]): x for x in json.loads(
+        Path(old_path).read_text())["results"]}
+    for result in json.loads(Path(new_path).read_text())["results"]:
+        key = (result["mix"], result["blocks"])
+        if key not in old:
+            continue
+        before = old[key]
+        print(
+            f"{key[0]:>8} {key[1]:>4} blocks: "
+            f"{result['packets_per_second'] / before['packets_per_second']:.2f}x pkt/s, "
+            f"p95 {before['latency_us']['p95']} -> {result['latency_us']['p95']} us, "
+            f"peak {before['alloc_peak_bytes']} -> {result['alloc_peak_bytes']} B"
+        )
+
+
+def main():
+    parser = ArgumentParser(
+        description="Benchmark the MESH notification path.")
+    parser.add_argument("--mix", action="append", choices=list(MIXES))
+    parser.add_argument("--sizes", default="1,10,100")
+    parser.add_argument("--packets", type=int, default=1000,
+                        help="packets per block")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+    results = run(run_suite(
+        args.mix or list(MIXES),
+        [int(x) for x in args.sizes.split(",")],
+        args.packets,
+    ))
+    Path(args.output).write_text(json.dumps({
+        "revision": revision(),
+        "python": platform.python_version(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
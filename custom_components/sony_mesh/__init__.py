@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from asyncio import Future, create_task, wait_for
+from asyncio import (FIRST_COMPLETED, Future, Task, TimerHandle, create_task,
+                     current_task, shield, sleep, wait, wait_for)
+from datetime import datetime
 from logging import getLogger
 from struct import pack
-from typing import Callable, Iterable
+from typing import Any, Callable, Iterable, Mapping, NamedTuple
 
+import voluptuous as vol
 from bleak import BleakClient
 from bleak.backends.device import BLEDevice
 from homeassistant.components import bluetooth
@@ -14,12 +17,23 @@ from homeassistant.components.bluetooth.models import HaBleakClientWrapper
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (CONF_ADDRESS, CONF_DEVICE_ID, CONF_NAME,
                                  CONF_TYPE, Platform)
-from homeassistant.core import EventOrigin, HomeAssistant
+from homeassistant.core import (Context, Event, EventOrigin, HomeAssistant,
+                               ServiceCall)
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import device_registry
 from homeassistant.helpers.entity import DeviceInfo, Entity
-from reactivex import Observable, Subject
-from reactivex import operators as ops
-from reactivex.subject.behaviorsubject import BehaviorSubject
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt
+
+from . import capture, fleet, protocol
+from .commands import (PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL,
+                       MESHCommandQueue)
+from .connection import (DEFAULT_BACKOFF_BASE, DEFAULT_BACKOFF_MAX,
+                         DEFAULT_BREAKER_INTERVAL, DEFAULT_BREAKER_THRESHOLD,
+                         MESHBackoff, MESHConnectScheduler)
+from .observable import MESHEvent, MESHKeyedEvent, MESHState
+from .stats import (DEFAULT_WINDOW, DIRECTION_RX, DIRECTION_TX, MESHPacketLog,
+                    MESHPhaseTimer, MESHSampleWindow, WindowStats)
 
 DOMAIN = "sony_mesh"
 
@@ -27,16 +41,44 @@ CORE_INDICATE_UUID = ('72c90005-57a9-4d40-b746-534e22ec9f9e')
 CORE_NOTIFY_UUID = ('72c90003-57a9-4d40-b746-534e22ec9f9e')
 CORE_WRITE_UUID = ('72c90004-57a9-4d40-b746-534e22ec9f9e')
 
+CMD_AIN_READ = b"\x01\x03\x00\x01\x05"
 CMD_FEATURE_ENABLE = b"\x00\x02\x01\x03"
 
-_PLATFORMS = {
-    Platform.BINARY_SENSOR,
-    Platform.LIGHT,
-    Platform.NUMBER,
-    Platform.SENSOR,
-    Platform.SWITCH,
-}
-
+CONF_AIN_INTERVAL = "ain_interval"
+CONF_AIN_WINDOW = "ain_window"
+CONF_BACKOFF_BASE = "backoff_base"
+CONF_BACKOFF_MAX = "backoff_max"
+CONF_BREAKER_INTERVAL = "breaker_interval"
+CONF_BREAKER_THRESHOLD = "breaker_threshold"
+CONF_CONNECTION = "connection"
+CONF_DEADBAND_MODE = "deadband_mode"
+CONF_DIN_DEBOUNCE = "din_debounce"
+CONF_HEARTBEAT = "heartbeat"
+CONF_IDLE_TIMEOUT = "idle_timeout"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_PULSE_INTERVAL = "pulse_interval"
+CONF_WRITE_DELAY = "write_delay"
+
+CONNECTION_ALWAYS = "always"
+CONNECTION_ON_DEMAND = "on_demand"
+
+DEADBAND_ABSOLUTE = "absolute"
+DEADBAND_PERCENT = "percent"
+
+DEFAULT_AIN_WINDOW = 10
+DEFAULT_DEMAND_TIMEOUT = 20.0
+DEFAULT_HEARTBEAT = 300
+DEFAULT_IDLE_TIMEOUT = 30.0
+DEFAULT_PULSE_INTERVAL = 60
+DEFAULT_WRITE_DELAY = 0.01
+
+MIN_AIN_INTERVAL = 0.05
+
+STORAGE_SAVE_DELAY = 10
+STORAGE_VERSION = 1
+
+DATA_CAPTURE = f"{DOMAIN}_capture"
+DATA_TRIGGERS = f"{DOMAIN}_triggers"
 
 BUTTON_PUSH_TYPES = {
     1: "single",
@@ -47,145 +89,481 @@ BUTTON_PUSH_TYPES = {
 _LOGGER = getLogger(__name__)
 
 
+class MESHDispatcher:
+    def __init__(self, index_offsets: Mapping[tuple[int, int], int] | None = None):
+        self.counts: dict[tuple[int, int], int] = {}
+        self._handlers = MESHKeyedEvent[tuple[int, ...], tuple]()
+        self._index_offsets = dict(index_offsets or {})
+
+    def subscribe(self, opcode: tuple[int, ...], func: Callable[[tuple], None]):
+        return self._handlers.subscribe(opcode, func)
+
+    def dispatch(self, data: bytes | bytearray, frame: tuple | None):
+        key = (data[0], data[1])
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if frame is None:
+            return
+        for func in self._handlers.get(key):
+            func(frame)
+        offset = self._index_offsets.get(key)
+        if offset is None:
+            return
+        for func in self._handlers.get((*key, data[offset])):
+            func(frame)
+
+
+class MESHTriggerDispatcher:
+    def __init__(self):
+        self._handlers = MESHKeyedEvent[tuple[str, str], Event]()
+
+    def subscribe(self, device_id: str, trigger_type: str, func: Callable[[Event], None]):
+        return self._handlers.subscribe((device_id, trigger_type), func)
+
+    def dispatch(self, device_id: str, trigger_type: str, event: Callable[[], Event]):
+        if handlers := self._handlers.get((device_id, trigger_type)):
+            fired = event()
+            for func in handlers:
+                func(fired)
+
+
+class MESHModel(NamedTuple):
+    core: type[MESHCore]
+    frames: protocol.FrameTable
+    entities: Mapping[Platform, tuple[str, ...]]
+    triggers: tuple[str, ...] = ("core_icon",)
+    services: tuple[str, ...] = ("status",)
+    init: tuple[bytes, ...] = ()
+    conditions: tuple[str, ...] = ()
+
+
 class MESHCore:
+    actuator = False
+    capture: Callable[[str, int, bytes | bytearray], None] | None = None
     client = None
+    client_class: type[BleakClient] = HaBleakClientWrapper
+    idle_timeout = DEFAULT_IDLE_TIMEOUT
     info = None
+    last_connected: datetime | None = None
+    on_demand = False
+    stale = True
+    _index_offsets: Mapping[tuple[int, int], int] = {}
+    __device: tuple[BLEDevice, str] | None = None
+    __idle: TimerHandle | None = None
     __task = None
+    __limits: tuple[tuple[str, str, float, bool], ...] = ()
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, model: MESHModel | None = None):
         self.hass = hass
         self.name = entry.data[CONF_NAME]
+        self.model = model or get_model(self.name)
+        self.platforms = frozenset(self.model.entities)
         self.entry_id = entry.entry_id
         self.dr = device_registry.async_get(hass)
+        self.scheduler: MESHConnectScheduler = hass.data[DOMAIN]
+        self.triggers = get_triggers(hass)
         self.device_info = DeviceInfo(
             identifiers={(DOMAIN, self.name)},
             manufacturer="Sony",
             model=self.name[:10],
             name=self.name,
         )
-        self.received = Subject[bytes]()
-        self.battery = BehaviorSubject[int | None](None)
-        self.connect_changed = BehaviorSubject[bool](False)
+        device = self.dr.async_get_or_create(
+            config_entry_id=self.entry_id, **self.device_info)
+        self.device_id = device.id
+        if device.sw_version:
+            self.device_info = DeviceInfo(
+                {**self.device_info, "sw_version": device.sw_version})
+        self.store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{self.name}")
+        self.dispatcher = MESHDispatcher(self._index_offsets)
+        self.commands = MESHCommandQueue(self.name)
+        self.battery = MESHState[int | None](None)
+        self.connect_changed = MESHState[bool](False)
+        self.backoff = MESHBackoff()
+        self.options = MESHState[Mapping[str, Any]](entry.options)
+        self.failures = MESHState[int](0)
+        self.phase_changed = MESHEvent[str]()
+        self.phases = MESHPhaseTimer(self.phase_changed.on_next)
+        self.packets = MESHPacketLog()
+        if writer := hass.data.get(DATA_CAPTURE):
+            self.capture = writer.record
+        self.dispatcher.subscribe((0, 0), self.__battery_received)
+        self.dispatcher.subscribe((0, 1), self.__icon_received)
+        self.dispatcher.subscribe((0, 2), self.__info_received)
+        self.__conditions: dict[str, bool] = {}
+        if self.model.conditions:
+            self.dispatcher.subscribe((1, 0), self.__condition_received)
+        self.update_options(entry.options)
+
+    def update_options(self, options: Mapping[str, Any]):
+        self.backoff.base = options.get(CONF_BACKOFF_BASE, DEFAULT_BACKOFF_BASE)
+        self.backoff.maximum = options.get(
+            CONF_BACKOFF_MAX, DEFAULT_BACKOFF_MAX)
+        self.backoff.threshold = options.get(
+            CONF_BREAKER_THRESHOLD, DEFAULT_BREAKER_THRESHOLD)
+        self.backoff.interval = options.get(
+            CONF_BREAKER_INTERVAL, DEFAULT_BREAKER_INTERVAL)
+        self.on_demand = self.actuator and options.get(
+            CONF_CONNECTION, CONNECTION_ALWAYS) == CONNECTION_ON_DEMAND
+        self.idle_timeout = options.get(CONF_IDLE_TIMEOUT, DEFAULT_IDLE_TIMEOUT)
+        self.__touch()
+        self.__limits = tuple(
+            (key, f"{key}_{direction}", options[f"{key}_{direction}"], direction == "above")
+            for key in self.model.conditions
+            for direction in ("above", "below")
+            if options.get(f"{key}_{direction}") is not None
+        )
+        self.__conditions.clear()
+        self.options.on_next(options)
+
+    async def async_restore(self):
+        if not (data := await self.store.async_load()):
+            return
+        if (version := data.get("sw_version")) and not self.device_info.get("sw_version"):
+            self.device_info = DeviceInfo(
+                {**self.device_info, "sw_version": version})
+            self.dr.async_update_device(self.device_id, sw_version=version)
+        if last_connected := data.get("last_connected"):
+            self.last_connected = dt.parse_datetime(last_connected)
+        if self.battery.value is None:
+            self.battery.on_next(data.get("battery"))
 
     def close(self):
         self.client = None
+        self.commands.stop()
+        if self.__idle is not None:
+            self.__idle.cancel()
+            self.__idle = None
         if self.__task is not None:
             self.__task.cancel()
 
     def on_found(self, service: BluetoothServiceInfoBleak, change: BluetoothChange):
         if not service.connectable:
             return
-        if self.__task is not None:
+        self.__device = (service.device, service.source)
+        if self.__task is not None or self.on_demand:
+            return
+        if not self.backoff.ready(self.hass.loop.time()):
             return
-        self.__task = create_task(self.__loop(service.device))
+        self.__task = create_task(self.__loop(service.device, service.source))
 
-    async def send_cmd(self, data: bytes):
-        await self.send(add_checksum(data))
+    @property
+    def source(self):
+        return self.__device[1] if self.__device is not None else None
 
-    async def send(self, data: bytes):
-        if not self.client:
+    @property
+    def connect_priority(self):
+        return 0 if self.actuator or self.on_demand or len(self.commands) else 1
+
+    async def send_cmd(self, data: bytes, priority=PRIORITY_HIGH):
+        await self.send(add_checksum(data), priority)
+
+    def check_writable(self):
+        if not self.client and not self.on_demand:
             raise Exception(self.name + " is not connected")
-        await self.client.write_gatt_char(CORE_WRITE_UUID, data, True)
+
+    async def send(self, data: bytes, priority=PRIORITY_HIGH):
+        if not self.client:
+            self.check_writable()
+            await self._demand()
+        self.__touch()
+        await self.commands.send(data, priority)
 
     async def _connected(self):
-        pass
+        for data in self.model.init:
+            await self.send_cmd(data, PRIORITY_NORMAL)
+
+    def _fire(self, event_type: str, trigger_type: str, data: dict[str, Any]):
+        context = Context()
+        self.hass.bus.async_fire(
+            event_type, data, EventOrigin.remote, context)
+        self.triggers.dispatch(self.device_id, trigger_type, lambda: Event(
+            event_type, data, EventOrigin.remote, context=context))
 
     def _received(self, sender, data: bytearray):
-        d = bytes(data)
-        self.received.on_next(d)
-        if d[:2] == b"\x00\x02":
-            self.battery.on_next(d[14] * 10)
-            self.device_info["sw_version"] = ".".join(
-                str(x) for x in d[7:10])
-            self.device_id = self.dr.async_get_or_create(
-                config_entry_id=self.entry_id,
-                identifiers=self.device_info.get("identifiers"),
-                sw_version=self.device_info["sw_version"],
-            ).id
-            if self.info is not None and not self.info.done():
-                self.info.set_result(None)
-        elif d[:2] == b"\x00\x01":
-            self.hass.bus.async_fire("sony_mesh_icon", {
-                CONF_DEVICE_ID: self.device_id,
-                CONF_NAME: self.name,
-            }, EventOrigin.remote)
-        elif d[:2] == b"\x00\x00":
-            self.battery.on_next(d[2] * 10)
+        self.packets.record(DIRECTION_RX, data)
+        if self.capture is not None:
+            self.capture(self.name, DIRECTION_RX, data)
+        try:
+            frame = protocol.decode(self.model.frames, data)
+        except ValueError as ex:
+            self.packets.malformed += 1
+            _LOGGER.debug(f"{self.name} dropped frame: {ex}")
+            return
+        self.dispatcher.dispatch(data, frame)
+
+    async def _demand(self):
+        if self.__task is not None and self.__task is current_task():
+            raise Exception(self.name + " is not connected")
+        deadline = self.hass.loop.time() + DEFAULT_DEMAND_TIMEOUT
+        started = False
+        while not self.client and not started:
+            if self.__task is None or self.__task.done():
+                if self.__device is None:
+                    raise Exception(self.name + " has not been discovered")
+                self.__task = create_task(self.__loop(*self.__device))
+                started = True
+            task = self.__task
+            ready = create_task(self.connect_changed.first(bool))
+            await wait((ready, task), timeout=max(deadline - self.hass.loop.time(), 0),
+                       return_when=FIRST_COMPLETED)
+            ready.cancel()
+            if not task.done():
+                break
+        if not self.client:
+            raise Exception(self.name + " is not connected")
+
+    def __touch(self):
+        if self.__idle is not None:
+            self.__idle.cancel()
+            self.__idle = None
+        if self.on_demand and self.client:
+            self.__idle = self.hass.loop.call_later(
+                self.idle_timeout, self.__idle_expired)
+
+    def __idle_expired(self):
+        self.__idle = None
+        if self.client and len(self.commands):
+            self.__touch()
+        elif client := self.client:
+            _LOGGER.debug(f"Disconnecting idle {self.name}")
+            self.hass.async_create_task(client.disconnect())
+
+    def __battery_received(self, frame: protocol.BatteryFrame):
+        self.stale = False
+        self.battery.on_next(frame.battery)
+        self.__save()
+
+    def __condition_received(self, frame: tuple):
+        for key, name, limit, above in self.__limits:
+            value = getattr(frame, key)
+            active = value > limit if above else value < limit
+            if active and not self.__conditions.get(name):
+                self._fire("sony_mesh_condition", name, {
+                    CONF_DEVICE_ID: self.device_id,
+                    CONF_NAME: self.name,
+                    CONF_TYPE: name,
+                    "value": value,
+                })
+            self.__conditions[name] = active
+
+    def __icon_received(self, frame: protocol.IconFrame):
+        self._fire("sony_mesh_icon", "core_icon", {
+            CONF_DEVICE_ID: self.device_id,
+            CONF_NAME: self.name,
+        })
+
+    def __info_received(self, frame: protocol.StatusFrame):
+        self.stale = False
+        self.battery.on_next(frame.battery)
+        version = frame.version
+        if version != self.device_info.get("sw_version"):
+            self.device_info = DeviceInfo(
+                {**self.device_info, "sw_version": version})
+            self.dr.async_update_device(self.device_id, sw_version=version)
+        if self.info is not None and not self.info.done():
+            self.info.set_result(None)
+        self.__save()
+
+    def __save(self):
+        self.store.async_delay_save(lambda: {
+            "sw_version": self.device_info.get("sw_version"),
+            "battery": self.battery.value,
+            "last_connected": self.last_connected and self.last_connected.isoformat(),
+        }, STORAGE_SAVE_DELAY)
+
+    async def __write(self, client: BleakClient, data: bytes):
+        self.packets.record(DIRECTION_TX, data)
+        if self.capture is not None:
+            self.capture(self.name, DIRECTION_TX, data)
+        try:
+            await client.write_gatt_char(CORE_WRITE_UUID, data, True)
+        except Exception:
+            self.packets.write_errors += 1
+            raise
 
     def __disconnected(self, client: BleakClient):
         client.set_disconnected_callback(None)
+        if self.client is client:
+            self.client = None
+        _LOGGER.debug(f"{self.name} opcode counts: {self.dispatcher.counts}")
+        self.stale = True
         self.connect_changed.on_next(False)
-        self.battery.on_next(None)
+        self.battery.on_next(self.battery.value)
 
-    async def __loop(self, device: BLEDevice):
+    async def __loop(self, device: BLEDevice, source: str):
+        client = None
+        release = None
+        measure = self.phases.measure
         try:
-            _LOGGER.debug(f"Connecting {device.name}")
-            async with HaBleakClientWrapper(device, self.__disconnected) as client:
+            with measure("total"):
+                _LOGGER.debug(
+                    f"Waiting {device.name} connection slot on {source}")
+                with measure("slot"):
+                    release = await self.scheduler.acquire(
+                        source, self.connect_priority)
+                _LOGGER.debug(f"Connecting {device.name}")
+                client = self.client_class(device, self.__disconnected)
+                with measure("connect"):
+                    await client.connect()
                 self.info = Future()
                 _LOGGER.debug(f"Enable {device.name} indicate")
-                await client.start_notify(CORE_INDICATE_UUID, self._received, force_indicate=True)
-                _LOGGER.debug(f"Waiting {device.name} indicate")
-                await wait_for(self.info, 10)
+                with measure("indicate"):
+                    await client.start_notify(CORE_INDICATE_UUID, self._received, force_indicate=True)
+                if not self.device_info.get("sw_version"):
+                    _LOGGER.debug(f"Waiting {device.name} indicate")
+                    with measure("info"):
+                        await wait_for(self.info, 10)
                 _LOGGER.debug(f"Enable {device.name} notify")
-                await client.start_notify(CORE_NOTIFY_UUID, self._received)
+                with measure("notify"):
+                    await client.start_notify(CORE_NOTIFY_UUID, self._received)
                 self.client = client
+                self.commands.start(lambda data: self.__write(client, data))
                 _LOGGER.debug(f"Enable {device.name} feature")
-                await wait_for(self.send(CMD_FEATURE_ENABLE), 5)
+                with measure("feature"):
+                    await self.send(CMD_FEATURE_ENABLE, PRIORITY_NORMAL)
                 _LOGGER.debug(f"Configure {device.name}")
-                await self._connected()
-
-                if not client.is_connected:
-                    return
-                self.connect_changed.on_next(True)
-                _LOGGER.debug(f"Connected {device.name}")
-                await self.connect_changed.pipe(
-                    ops.first(lambda x: x is not True),
-                )
+                with measure("configure"):
+                    await self._connected()
+            release()
+
+            if not client.is_connected:
+                raise Exception("Disconnected during setup")
+            self.last_connected = dt.utcnow()
+            self.__save()
+            self.connect_changed.on_next(True)
+            self.backoff.success()
+            self.__touch()
+            if self.failures.value:
+                self.failures.on_next(0)
+            _LOGGER.debug(f"Connected {device.name}")
+            await self.connect_changed.first(lambda x: x is not True)
+        except Exception as ex:
+            self.backoff.failure(self.hass.loop.time(), repr(ex))
+            _LOGGER.debug(
+                f"Failed {device.name} ({self.backoff.failures}): {ex!r}")
+            self.failures.on_next(self.backoff.failures)
         finally:
             _LOGGER.debug(f"Disconnected {device.name}")
+            if release is not None:
+                release()
             self.client = None
-            self.__task = None
+            self.commands.stop()
+            if client is not None:
+                try:
+                    await client.disconnect()
+                except Exception as ex:
+                    _LOGGER.debug(f"Disconnect {device.name} failed: {ex!r}")
+            if self.__task is current_task():
+                self.__task = None
             bluetooth._get_manager(self.hass)._connectable_history.pop(
                 device.address, None)
 
 
 class MESHAC(MESHCore):
-    def _received(self, sender, data: bytearray):
-        super()._received(sender, data)
-        if data[0] == 1:
-            if data[1] == 2:
-                self.hass.bus.async_fire("sony_mesh_move", {
-                    CONF_DEVICE_ID: self.device_id,
-                    CONF_NAME: self.name,
-                    CONF_TYPE: "flip",
-                }, EventOrigin.remote)
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, model: MESHModel | None = None):
+        super().__init__(hass, entry, model)
+        self.dispatcher.subscribe((1, 2), self.__flip_received)
+
+    def __flip_received(self, frame: protocol.FlipFrame):
+        self._fire("sony_mesh_move", "move_flip", {
+            CONF_DEVICE_ID: self.device_id,
+            CONF_NAME: self.name,
+            CONF_TYPE: "flip",
+        })
 
 
 class MESHBU(MESHCore):
-    def _received(self, sender, data: bytearray):
-        super()._received(sender, data)
-        if data[0] == 1:
-            if data[1] == 0:
-                self.hass.bus.async_fire("sony_mesh_button", {
-                    CONF_DEVICE_ID: self.device_id,
-                    CONF_NAME: self.name,
-                    "type": BUTTON_PUSH_TYPES[data[2]],
-                }, EventOrigin.remote)
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, model: MESHModel | None = None):
+        super().__init__(hass, entry, model)
+        self.dispatcher.subscribe((1, 0), self.__button_received)
+
+    def __button_received(self, frame: protocol.ButtonFrame):
+        push = BUTTON_PUSH_TYPES[frame.push]
+        self._fire("sony_mesh_button", f"button_{push}", {
+            CONF_DEVICE_ID: self.device_id,
+            CONF_NAME: self.name,
+            "type": push,
+        })
+
+
+class DINEdge(NamedTuple):
+    pin: int
+    is_on: bool
 
 
 class MESHGP(MESHCore):
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
-        super().__init__(hass, entry)
+    actuator = True
+    _index_offsets = {
+        (1, 0): 2,
+        (1, 2): 3,
+    }
+    __config_sent: bytes | None = None
+    __config_write: Task | None = None
+    __sampler: Task | None = None
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, model: MESHModel | None = None):
+        super().__init__(hass, entry, model)
         self.ain = False
+        self.ain_stats = MESHEvent[WindowStats]()
         self.din = [False, False, False]
+        self.din_edges = MESHEvent[DINEdge]()
+        self.pulses = [0, 0, 0]
+        self.bounces = [0, 0, 0]
+        self.edge_at: list[float | None] = [None, None, None]
+        self.__pulse_at = [float("-inf")] * 3
+        self.__raw = [False, False, False]
+        self.__settle: list[TimerHandle | None] = [None, None, None]
         self._reset_output()
+        self.dispatcher.subscribe((1, 1), self.__ain_received)
+        self.dispatcher.subscribe((1, 2), self.__edge_received)
+        self.dispatcher.subscribe((1, 3), self.__ain_received)
+
+    def update_options(self, options: Mapping[str, Any]):
+        self.write_delay: float = options.get(
+            CONF_WRITE_DELAY, DEFAULT_WRITE_DELAY)
+        self.din_debounce: float = options.get(CONF_DIN_DEBOUNCE, 0)
+        ain_interval = options.get(CONF_AIN_INTERVAL, 0)
+        self.ain_interval: float = max(
+            ain_interval, MIN_AIN_INTERVAL) if ain_interval else 0
+        self.ain_window: float = options.get(
+            CONF_AIN_WINDOW, DEFAULT_AIN_WINDOW)
+        self.ain_samples = MESHSampleWindow(max(
+            DEFAULT_WINDOW,
+            int(self.ain_window / self.ain_interval) * 2 if self.ain_interval else 0,
+        ))
+        super().update_options(options)
+        if self.client:
+            self.__start_sampler()
+
+    def close(self):
+        super().close()
+        for timer in self.__settle:
+            if timer is not None:
+                timer.cancel()
+        if self.__config_write is not None:
+            self.__config_write.cancel()
+        if self.__sampler is not None:
+            self.__sampler.cancel()
 
     async def send_config(self):
+        if self.__config_write is None:
+            self.__config_write = create_task(self.__write_config())
+        await shield(self.__config_write)
+
+    async def __write_config(self):
+        try:
+            await sleep(self.write_delay)
+        finally:
+            self.__config_write = None
         if not self.client:
-            return
+            if not self.on_demand:
+                return
+            await self._demand()
         din = sum(1 << i for i in range(3) if self.din[i])
         dout = sum(1 << i for i in range(3) if self.dout[i])
-        await self.send_cmd(pack(
+        data = pack(
             "<BBBBBBBBBB",
             1, 1,
             din, din,
@@ -193,17 +571,79 @@ class MESHGP(MESHCore):
             1 if self.power else 2,
             255, 0,
             0x22 if self.ain else 0x00,
-        ))
+        )
+        if data == self.__config_sent:
+            return
+        await self.send_cmd(data)
+        self.__config_sent = data
 
     async def _connected(self):
-        self._reset_output()
+        await super()._connected()
+        self.__config_sent = None
+        if not self.on_demand:
+            self._reset_output()
         await self.send_config()
+        self.__start_sampler()
 
     def _reset_output(self):
         self.aout = 0
         self.dout = [False, False, False]
         self.power = False
 
+    def __start_sampler(self):
+        if self.__sampler is not None:
+            self.__sampler.cancel()
+            self.__sampler = None
+        if self.ain and self.ain_interval:
+            self.__sampler = create_task(self.__sample())
+
+    async def __sample(self):
+        loop = self.hass.loop
+        flush_at = loop.time() + self.ain_window
+        while self.client:
+            try:
+                await self.send(CMD_AIN_READ, PRIORITY_LOW)
+            except Exception as ex:
+                _LOGGER.debug(f"{self.name} AIN sample failed: {ex!r}")
+            await sleep(self.ain_interval)
+            if loop.time() >= flush_at:
+                flush_at += self.ain_window
+                if (stats := self.ain_samples.flush()) is not None:
+                    self.ain_stats.on_next(stats)
+
+    def __edge_received(self, frame: protocol.GPIOEdgeFrame):
+        pin = frame.pin
+        if pin > 2:
+            return
+        now = self.hass.loop.time()
+        if frame.is_on:
+            if now - self.__pulse_at[pin] < self.din_debounce:
+                self.bounces[pin] += 1
+            else:
+                self.__pulse_at[pin] = now
+                self.pulses[pin] += 1
+        self.edge_at[pin] = now
+        self.__raw[pin] = frame.is_on
+        if (timer := self.__settle[pin]) is not None:
+            timer.cancel()
+        if self.din_debounce:
+            self.__settle[pin] = self.hass.loop.call_later(
+                self.din_debounce, self.__settled, pin)
+        else:
+            self.__settled(pin)
+
+    def __settled(self, pin: int):
+        self.__settle[pin] = None
+        self.din_edges.on_next(DINEdge(pin, self.__raw[pin]))
+
+    def __ain_received(self, frame: protocol.AnalogFrame):
+        if self.ain_interval:
+            self.ain_samples.add(frame.voltage)
+
+
+class MESHLE(MESHCore):
+    actuator = True
+
 
 class MESHMD(MESHCore):
     delay_time = 500
@@ -215,20 +655,90 @@ class MESHMD(MESHCore):
         mode = 0x03
         if init:
             mode |= 0x10
-        await self.send_cmd(pack("<BBBBHH", 1, 0, 0, mode, self.hold_time, self.delay_time))
+        await self.send_cmd(pack("<BBBBHH", 1, 0, 0, mode, self.hold_time, self.delay_time), PRIORITY_NORMAL)
 
     async def _connected(self):
+        await super()._connected()
         await self.send_config(True)
 
 
-class MESHPA(MESHCore):
-    async def _connected(self):
-        await self.send_cmd(pack("<BBBQHBBBB", 1, 0, 0, 0, 0, 2, 2, 2, 0x1C))
+_BASE_ENTITIES: Mapping[Platform, tuple[str, ...]] = {
+    Platform.LIGHT: ("status_led",),
+    Platform.SENSOR: ("battery", "connect_failures", "last_error", "phases"),
+    Platform.SWITCH: ("power",),
+}
 
 
-class MESHTH(MESHCore):
-    async def _connected(self):
-        await self.send_cmd(pack("<BBBQHB", 1, 0, 0, 0, 0, 0x1C))
+def _entities(**extra: tuple[str, ...]):
+    entities = dict(_BASE_ENTITIES)
+    for platform, keys in extra.items():
+        platform = Platform(platform)
+        entities[platform] = entities.get(platform, ()) + keys
+    return entities
+
+
+def _condition_triggers(*keys: str):
+    return tuple(f"{x}_{y}" for x in keys for y in ("above", "below"))
+
+
+GENERIC_MODEL = MESHModel(MESHCore, protocol.CORE_FRAMES, _entities())
+
+MODELS: dict[str, MESHModel] = {
+    "MESH-100AC": MESHModel(
+        MESHAC, protocol.AC_FRAMES,
+        _entities(sensor=("orientation",)),
+        triggers=("core_icon", "move_flip"),
+    ),
+    "MESH-100BU": MESHModel(
+        MESHBU, protocol.BU_FRAMES, _entities(),
+        triggers=("core_icon", "button_single", "button_double", "button_long"),
+    ),
+    "MESH-100GP": MESHModel(
+        MESHGP, protocol.GP_FRAMES,
+        _entities(
+            binary_sensor=("din",),
+            number=("analog_output",),
+            sensor=("ain", "ain_window", "pulses"),
+            switch=("dout", "power_output"),
+        ),
+    ),
+    "MESH-100LE": MESHModel(
+        MESHLE, protocol.CORE_FRAMES,
+        _entities(light=("led",)),
+        services=("status", "led"),
+    ),
+    "MESH-100MD": MESHModel(
+        MESHMD, protocol.MD_FRAMES,
+        _entities(
+            binary_sensor=("motion",),
+            number=("motion_delay", "motion_hold"),
+        ),
+    ),
+    "MESH-100PA": MESHModel(
+        MESHCore, protocol.PA_FRAMES,
+        _entities(sensor=("illuminance", "proximity")),
+        triggers=("core_icon", *_condition_triggers("illuminance", "proximity")),
+        init=(pack("<BBBQHBBBB", 1, 0, 0, 0, 0, 2, 2, 2, 0x1C),),
+        conditions=("illuminance", "proximity"),
+    ),
+    "MESH-100TH": MESHModel(
+        MESHCore, protocol.TH_FRAMES,
+        _entities(sensor=("humidity", "temperature")),
+        triggers=("core_icon", *_condition_triggers("humidity", "temperature")),
+        init=(pack("<BBBQHB", 1, 0, 0, 0, 0, 0x1C),),
+        conditions=("humidity", "temperature"),
+    ),
+}
+
+
+def get_model(name: str):
+    return MODELS.get(name[:10], GENERIC_MODEL)
+
+
+def get_triggers(hass: HomeAssistant) -> MESHTriggerDispatcher:
+    if DATA_TRIGGERS not in hass.data:
+        hass.data[DATA_TRIGGERS] = MESHTriggerDispatcher()
+    return hass.data[DATA_TRIGGERS]
 
 
 class MESHEntity(Entity):
@@ -248,11 +758,22 @@ class MESHEntity(Entity):
         self._subscribe(self.core.connect_changed, self._connect_changed)
 
     def _connect_changed(self, connected: bool):
-        self._attr_available = connected
+        self._attr_available = connected or self.core.on_demand
         self.async_write_ha_state()
 
-    def _subscribe(self, src: Observable, func: Callable):
-        self.async_on_remove(src.subscribe(func).dispose)
+    def _listen(self, opcode: tuple[int, ...], func: Callable[[tuple], None]):
+        self.async_on_remove(self.core.dispatcher.subscribe(opcode, func))
+
+    def _subscribe(self, src: MESHEvent, func: Callable):
+        self.async_on_remove(src.subscribe(func))
+
+
+def create_entities(core: MESHCore, platform: Platform, factories: Mapping[str, Callable[[Any, str], Iterable[Entity]]]):
+    return [
+        entity
+        for key in core.model.entities.get(platform, ())
+        for entity in factories[key](core, core.name)
+    ]
 
 
 def add_checksum(data: Iterable[int]):
@@ -261,34 +782,92 @@ def add_checksum(data: Iterable[int]):
     return bytes(data)
 
 
+def _cores(hass: HomeAssistant) -> dict[str, MESHCore]:
+    cores = (hass.data.get(x.entry_id)
+             for x in hass.config_entries.async_entries(DOMAIN))
+    return {x.name: x for x in cores if isinstance(x, MESHCore)}
+
+
+def _register_services(hass: HomeAssistant):
+    async def start_capture(call: ServiceCall):
+        await stop_capture(call)
+        path = call.data.get("path") or hass.config.path(f"{DOMAIN}.cap")
+        if not hass.config.is_allowed_path(path):
+            raise ValueError(f"{path} is not an allowed path")
+        writer = capture.MESHCaptureWriter(
+            hass, path, call.data["max_size"] * 1024 * 1024)
+        writer.start()
+        hass.data[DATA_CAPTURE] = writer
+        for core in _cores(hass).values():
+            core.capture = writer.record
+
+    async def stop_capture(call: ServiceCall):
+        if (writer := hass.data.pop(DATA_CAPTURE, None)) is None:
+            return
+        for core in _cores(hass).values():
+            core.capture = None
+        await writer.async_stop()
+
+    async def replay_capture(call: ServiceCall):
+        path = call.data["path"]
+        if not hass.config.is_allowed_path(path):
+            raise ValueError(f"{path} is not an allowed path")
+        await capture.async_replay(hass, _cores(hass), path, call.data["realtime"])
+
+    async def apply_scene(call: ServiceCall):
+        results = await fleet.async_apply_scene(
+            hass, _cores(hass), call.data["entities"],
+            hass.data[DOMAIN].slots, call.data["timeout"])
+        hass.bus.async_fire("sony_mesh_scene", {
+            "success": all(x["success"] for x in results),
+            "results": results,
+        }, context=call.context)
+
+    hass.services.async_register(DOMAIN, "start_capture", start_capture, vol.Schema({
+        vol.Optional("path"): cv.string,
+        vol.Optional("max_size", default=16): vol.All(vol.Coerce(int), vol.Range(1, 1024)),
+    }))
+    hass.services.async_register(DOMAIN, "stop_capture", stop_capture)
+    hass.services.async_register(DOMAIN, "replay_capture", replay_capture, vol.Schema({
+        vol.Required("path"): cv.string,
+        vol.Optional("realtime", default=True): cv.boolean,
+    }))
+    hass.services.async_register(DOMAIN, "apply_scene", apply_scene, vol.Schema({
+        vol.Required("entities"): fleet.scene_entities,
+        vol.Optional("timeout", default=fleet.DEFAULT_TIMEOUT): vol.All(vol.Coerce(float), vol.Range(0.1, 60)),
+    }))
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
-    name: str = entry.data[CONF_NAME]
-    if name.startswith("MESH-100AC"):
-        core = MESHAC(hass, entry)
-    elif name.startswith("MESH-100BU"):
-        core = MESHBU(hass, entry)
-    elif name.startswith("MESH-100GP"):
-        core = MESHGP(hass, entry)
-    elif name.startswith("MESH-100MD"):
-        core = MESHMD(hass, entry)
-    elif name.startswith("MESH-100PA"):
-        core = MESHPA(hass, entry)
-    elif name.startswith("MESH-100TH"):
-        core = MESHTH(hass, entry)
-    else:
-        core = MESHCore(hass, entry)
+    if DOMAIN not in hass.data:
+        hass.data[DOMAIN] = MESHConnectScheduler()
+    if not hass.services.has_service(DOMAIN, "start_capture"):
+        _register_services(hass)
+    model = get_model(entry.data[CONF_NAME])
+    core = model.core(hass, entry, model)
+    await core.async_restore()
     entry.async_on_unload(bluetooth.async_register_callback(hass, core.on_found, {
         "address": entry.data[CONF_ADDRESS],
     }, bluetooth.BluetoothScanningMode.PASSIVE))
+    entry.async_on_unload(entry.add_update_listener(_async_update_options))
     hass.data[entry.entry_id] = core
-    hass.config_entries.async_setup_platforms(entry, _PLATFORMS)
+    hass.config_entries.async_setup_platforms(entry, core.platforms)
     return True
 
 
+async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry):
+    if core := hass.data.get(entry.entry_id):
+        core.update_options(entry.options)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
-    if not await hass.config_entries.async_unload_platforms(entry, _PLATFORMS):
+    core: MESHCore = hass.data[entry.entry_id]
+    if not await hass.config_entries.async_unload_platforms(entry, core.platforms):
         return False
-    if client := hass.data.pop(entry.entry_id, None):
-        client.close()
+    hass.data.pop(entry.entry_id).close()
     bluetooth.async_rediscover_address(hass, entry.data[CONF_ADDRESS])
     return True
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.data[CONF_NAME]}").async_remove()
@@ -4,39 +4,42 @@ from struct import pack
 from homeassistant.components.binary_sensor import (BinarySensorDeviceClass,
                                                     BinarySensorEntity)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_NAME
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import MESHGP, MESHMD, MESHCore, MESHEntity
+from . import (PRIORITY_LOW, MESHGP, MESHMD, DINEdge, MESHCore, MESHEntity,
+               create_entities)
+from .protocol import GPIOFrame, MotionFrame
+
+
+_ENTITIES = {
+    "din": lambda core, name: [
+        MESHDigitalInputEntity(core, name, x) for x in (1, 2, 3)
+    ],
+    "motion": lambda core, name: [MESHMotionEntity(core, name)],
+}
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
     core: MESHCore = hass.data[entry.entry_id]
-    name: str = entry.data[CONF_NAME]
-    if type(core) is MESHGP:
-        async_add_entities([
-            MESHDigitalInputEntity(core, name, 1),
-            MESHDigitalInputEntity(core, name, 2),
-            MESHDigitalInputEntity(core, name, 3),
-        ])
-    elif type(core) is MESHMD:
-        async_add_entities([
-            MESHMotionEntity(core, name),
-        ])
+    async_add_entities(create_entities(core, Platform.BINARY_SENSOR, _ENTITIES))
 
 
 class MESHBinarySensorEntity(MESHEntity, BinarySensorEntity):
+    _opcodes: tuple[tuple[int, ...], ...] = ()
+
     async def async_added_to_hass(self):
         await super().async_added_to_hass()
-        self._subscribe(self.core.received, self._received)
+        for opcode in self._opcodes:
+            self._listen(opcode, self._received)
 
     def _connect_changed(self, connected: bool):
         self._attr_is_on = None
         super()._connect_changed(connected)
 
     @abstractclassmethod
-    def _received(self, data: bytes):
+    def _received(self, frame: tuple):
         ...
 
 
@@ -48,52 +51,48 @@ class MESHDigitalInputEntity(MESHBinarySensorEntity):
         super().__init__(core)
         self.pin = pin
         self._attr_unique_id = f"{name}-din{pin}"
+        self._opcodes = ((1, 0, pin - 1),)
 
     async def async_added_to_hass(self):
         await super().async_added_to_hass()
-        self.core.din[self.pin] = True
+        self.core.din[self.pin - 1] = True
+        self._subscribe(self.core.din_edges, self.__edge_received)
 
     async def async_will_remove_from_hass(self):
         await super().async_will_remove_from_hass()
-        self.core.din[self.pin] = False
+        self.core.din[self.pin - 1] = False
 
     def _connect_changed(self, connected: bool):
         if connected:
             self.hass.loop.create_task(self.core.send_cmd(
-                pack("<HHHH", 1, 2, 0, self.pin - 1)))
+                pack("<HHHH", 1, 2, 0, self.pin - 1), PRIORITY_LOW))
         if self._attr_available:
             self._attr_available = False
             self.async_write_ha_state()
 
-    def _received(self, data: bytes):
-        if data[:2] == b"\x01\x00":
-            if data[2] != self.pin - 1:
-                return
-            self._attr_is_on = data[3] == 1
-        elif data[:2] == b"\x01\x02":
-            if data[3] != self.pin - 1:
-                return
-            self._attr_is_on = data[4] == 0
-        else:
+    def _received(self, frame: GPIOFrame):
+        self._attr_is_on = frame.is_on
+        self._attr_available = True
+        self.async_write_ha_state()
+
+    def __edge_received(self, edge: DINEdge):
+        if edge.pin != self.pin - 1:
             return
+        if self._attr_available and self._attr_is_on == edge.is_on:
+            return
+        self._attr_is_on = edge.is_on
         self._attr_available = True
         self.async_write_ha_state()
 
 
 class MESHMotionEntity(MESHBinarySensorEntity):
     _attr_device_class = BinarySensorDeviceClass.MOTION
+    _opcodes = ((1, 0),)
 
     def __init__(self, core: MESHMD, name: str):
         super().__init__(core)
         self._attr_unique_id = name
 
-    def _received(self, data: bytes):
-        if data[:2] != b"\x01\x00":
-            return
-        if data[3] == 1:
-            self._attr_is_on = True
-        elif data[3] == 2:
-            self._attr_is_on = False
-        else:
-            self._attr_is_on = None
+    def _received(self, frame: MotionFrame):
+        self._attr_is_on = frame.is_on
         self.async_write_ha_state()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import os
+from asyncio import Lock, sleep
+from datetime import timedelta
+from logging import getLogger
+from struct import Struct
+from time import monotonic
+from typing import Callable, Iterator
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .stats import DIRECTION_RX
+
+MAGIC = b"MESHCAP1"
+DIRECTION_NAME = 0xFF
+
+DEFAULT_BACKUPS = 3
+DEFAULT_FLUSH_BYTES = 64 * 1024
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+_RECORD = Struct("<dHBB")
+_LOGGER = getLogger(__name__)
+
+
+class MESHCaptureWriter:
+    def __init__(self, hass: HomeAssistant, path: str, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+        self.hass = hass
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.records = 0
+        self._blocks: dict[str, int] = {}
+        self._buffer = bytearray()
+        self._lock = Lock()
+        self._size = 0
+        self._cancel: Callable[[], None] | None = None
+
+    def start(self):
+        self._cancel = async_track_time_interval(
+            self.hass, self._async_flush, timedelta(seconds=1))
+
+    async def async_stop(self):
+        if self._cancel is not None:
+            self._cancel()
+            self._cancel = None
+        await self._async_flush()
+
+    @callback
+    def record(self, name: str, direction: int, data: bytes | bytearray):
+        block = self._blocks.get(name)
+        if block is None:
+            block = self._blocks[name] = len(self._blocks)
+            encoded = name.encode()
+            self._buffer += _RECORD.pack(0, block, DIRECTION_NAME, len(encoded))
+            self._buffer += encoded
+        self._buffer += _RECORD.pack(monotonic(), block, direction, len(data))
+        self._buffer += data
+        self.records += 1
+        if len(self._buffer) >= DEFAULT_FLUSH_BYTES:
+            self.hass.async_create_task(self._async_flush())
+
+    async def _async_flush(self, *args):
+        if not self._buffer:
+            return
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        async with self._lock:
+            await self.hass.async_add_executor_job(
+                self._write, chunk, dict(self._blocks))
+
+    def _write(self, chunk: bytes, blocks: dict[str, int]):
+        if not self._size or self._size + len(chunk) > self.max_bytes:
+            if os.path.exists(self.path):
+                self._rotate()
+            self._size = 0
+        with open(self.path, "ab" if self._size else "wb") as file:
+            if not self._size:
+                file.write(MAGIC)
+                for name, block in blocks.items():
+                    encoded = name.encode()
+                    file.write(_RECORD.pack(
+                        0, block, DIRECTION_NAME, len(encoded)))
+                    file.write(encoded)
+            file.write(chunk)
+            self._size = file.tell()
+
+    def _rotate(self):
+        if not self.backups:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+def read_capture(path: str) -> Iterator[tuple[float, str, int, bytes]]:
+    names: dict[int, str] = {}
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a MESH capture")
+        while header := file.read(_RECORD.size):
+            if len(header) < _RECORD.size:
+                return
+            time, block, direction, length = _RECORD.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                return
+            if direction == DIRECTION_NAME:
+                names[block] = data.decode()
+            else:
+                yield time, names.get(block, str(block)), direction, data
+
+
+async def async_replay(hass: HomeAssistant, cores: dict, path: str, realtime=True):
+    records = await hass.async_add_executor_job(list, read_capture(path))
+    replayed = 0
+    start = None
+    begin = monotonic()
+    for time, name, direction, data in records:
+        if direction != DIRECTION_RX or (core := cores.get(name)) is None:
+            continue
+        if realtime:
+            if start is None:
+                start = time
+            if (delay := time - start - (monotonic() - begin)) > 0:
+                await sleep(delay)
+        core._received(None, bytearray(data))
+        replayed += 1
+        if not realtime and not replayed % 500:
+            await sleep(0)
+    _LOGGER.debug(f"Replayed {replayed} of {len(records)} frames from {path}")
+    return replayed
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from asyncio import (CancelledError, Future, PriorityQueue, QueueEmpty,
+                     QueueFull, Task, create_task, get_running_loop, wait_for)
+from itertools import count
+from logging import getLogger
+from typing import Awaitable, Callable
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+DEFAULT_MAXSIZE = 16
+DEFAULT_STALE = 10.0
+DEFAULT_TIMEOUT = 5.0
+
+_LOGGER = getLogger(__name__)
+
+
+class MESHCommand:
+    __slots__ = ("data", "expires", "future", "timeout")
+
+    def __init__(self, data: bytes, expires: float, future: Future[None], timeout: float):
+        self.data = data
+        self.expires = expires
+        self.future = future
+        self.timeout = timeout
+
+
+class MESHCommandQueue:
+    __worker: Task | None = None
+
+    def __init__(self, name: str, maxsize=DEFAULT_MAXSIZE, timeout=DEFAULT_TIMEOUT, stale=DEFAULT_STALE):
+        self.name = name
+        self.timeout = timeout
+        self.stale = stale
+        self._queue = PriorityQueue[tuple[int, int, MESHCommand]](maxsize)
+        self._seq = count()
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    async def send(self, data: bytes, priority=PRIORITY_HIGH, timeout: float | None = None):
+        loop = get_running_loop()
+        command = MESHCommand(
+            data,
+            loop.time() + self.stale,
+            loop.create_future(),
+            self.timeout if timeout is None else timeout,
+        )
+        try:
+            self._queue.put_nowait((priority, next(self._seq), command))
+        except QueueFull:
+            raise Exception(self.name + " command queue is full")
+        await command.future
+
+    def start(self, write: Callable[[bytes], Awaitable]):
+        if self.__worker is not None:
+            self.__worker.cancel()
+        self.__worker = create_task(self.__run(write))
+
+    def stop(self):
+        if self.__worker is not None:
+            self.__worker.cancel()
+            self.__worker = None
+        while True:
+            try:
+                _, _, command = self._queue.get_nowait()
+            except QueueEmpty:
+                return
+            if not command.future.done():
+                command.future.set_exception(
+                    Exception(self.name + " is not connected"))
+
+    async def __run(self, write: Callable[[bytes], Awaitable]):
+        loop = get_running_loop()
+        while True:
+            _, _, command = await self._queue.get()
+            if command.future.done():
+                continue
+            if loop.time() > command.expires:
+                _LOGGER.debug(f"{self.name} dropped stale command")
+                command.future.set_exception(
+                    TimeoutError(self.name + " command expired in queue"))
+                continue
+            try:
+                await wait_for(write(command.data), command.timeout)
+            except CancelledError:
+                if not command.future.done():
+                    command.future.set_exception(
+                        Exception(self.name + " is not connected"))
+                raise
+            except Exception as ex:
+                if not command.future.done():
+                    command.future.set_exception(ex)
+            else:
+                if not command.future.done():
+                    command.future.set_result(None)
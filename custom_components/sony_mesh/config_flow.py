@@ -1,16 +1,37 @@
 from typing import Any, Mapping
 
+import voluptuous as vol
 from homeassistant.components.bluetooth import BluetoothServiceInfoBleak
-from homeassistant.config_entries import ConfigFlow
-from homeassistant.const import CONF_ADDRESS, CONF_NAME
+from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
+from homeassistant.const import CONF_ADDRESS, CONF_NAME, Platform
+from homeassistant.core import callback
 
-from . import DOMAIN
+from . import (CONF_AIN_INTERVAL, CONF_AIN_WINDOW, CONF_BACKOFF_BASE,
+               CONF_BACKOFF_MAX, CONF_BREAKER_INTERVAL, CONF_BREAKER_THRESHOLD,
+               CONF_CONNECTION, CONF_DEADBAND_MODE, CONF_DIN_DEBOUNCE,
+               CONF_HEARTBEAT, CONF_IDLE_TIMEOUT, CONF_MIN_INTERVAL,
+               CONF_PULSE_INTERVAL, CONF_WRITE_DELAY, CONNECTION_ALWAYS,
+               CONNECTION_ON_DEMAND, DEADBAND_ABSOLUTE, DEADBAND_PERCENT,
+               DEFAULT_AIN_WINDOW, DEFAULT_HEARTBEAT, DEFAULT_IDLE_TIMEOUT,
+               DEFAULT_PULSE_INTERVAL, DEFAULT_WRITE_DELAY, DOMAIN, MESHGP,
+               get_model)
+from .connection import (DEFAULT_BACKOFF_BASE, DEFAULT_BACKOFF_MAX,
+                         DEFAULT_BREAKER_INTERVAL, DEFAULT_BREAKER_THRESHOLD)
+
+_DEADBAND_KEYS = ("ain", "humidity", "illuminance", "proximity", "temperature")
+
+_SECONDS = vol.All(vol.Coerce(float), vol.Range(min=0))
 
 
 class MESHConfigFlow(ConfigFlow, domain=DOMAIN):
     VERSION = 1
     name = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry):
+        return MESHOptionsFlow(config_entry)
+
     async def async_step_bluetooth(self, discovery_info: BluetoothServiceInfoBleak):
         self.address = discovery_info.address
         self.name = discovery_info.advertisement.local_name
@@ -39,3 +60,92 @@ class MESHConfigFlow(ConfigFlow, domain=DOMAIN):
             },
             last_step=True,
         )
+
+
+class MESHOptionsFlow(OptionsFlow):
+    def __init__(self, config_entry: ConfigEntry):
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input: Mapping[str, Any] | None = None):
+        if user_input is not None:
+            return self.async_create_entry(title="", data=dict(user_input))
+        options = self.config_entry.options
+        model = get_model(self.config_entry.data[CONF_NAME])
+        schema: dict[Any, Any] = {}
+        for key in model.conditions:
+            for direction in ("above", "below"):
+                schema[vol.Optional(
+                    f"{key}_{direction}",
+                    description={
+                        "suggested_value": options.get(f"{key}_{direction}")},
+                )] = vol.Coerce(float)
+        if keys := [x for x in model.entities.get(Platform.SENSOR, ())
+                    if x in _DEADBAND_KEYS]:
+            schema[vol.Required(
+                CONF_DEADBAND_MODE,
+                default=options.get(CONF_DEADBAND_MODE, DEADBAND_ABSOLUTE),
+            )] = vol.In([DEADBAND_ABSOLUTE, DEADBAND_PERCENT])
+            for key in keys:
+                schema[vol.Required(
+                    f"deadband_{key}",
+                    default=options.get(f"deadband_{key}", 0.0),
+                )] = vol.All(vol.Coerce(float), vol.Range(min=0))
+            schema[vol.Required(
+                CONF_MIN_INTERVAL,
+                default=options.get(CONF_MIN_INTERVAL, 0.0),
+            )] = _SECONDS
+            schema[vol.Required(
+                CONF_HEARTBEAT,
+                default=options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT),
+            )] = _SECONDS
+        if issubclass(model.core, MESHGP):
+            schema[vol.Required(
+                CONF_WRITE_DELAY,
+                default=options.get(CONF_WRITE_DELAY, DEFAULT_WRITE_DELAY),
+            )] = vol.All(vol.Coerce(float), vol.Range(min=0, max=1))
+            schema[vol.Required(
+                CONF_AIN_INTERVAL,
+                default=options.get(CONF_AIN_INTERVAL, 0.0),
+            )] = vol.All(vol.Coerce(float), vol.Range(min=0, max=60))
+            schema[vol.Required(
+                CONF_AIN_WINDOW,
+                default=options.get(CONF_AIN_WINDOW, DEFAULT_AIN_WINDOW),
+            )] = vol.All(vol.Coerce(float), vol.Range(min=1, max=3600))
+            schema[vol.Required(
+                CONF_DIN_DEBOUNCE,
+                default=options.get(CONF_DIN_DEBOUNCE, 0.0),
+            )] = vol.All(vol.Coerce(float), vol.Range(min=0, max=10))
+            schema[vol.Required(
+                CONF_PULSE_INTERVAL,
+                default=options.get(CONF_PULSE_INTERVAL, DEFAULT_PULSE_INTERVAL),
+            )] = vol.All(vol.Coerce(float), vol.Range(min=1, max=3600))
+        if model.core.actuator:
+            schema[vol.Required(
+                CONF_CONNECTION,
+                default=options.get(CONF_CONNECTION, CONNECTION_ALWAYS),
+            )] = vol.In([CONNECTION_ALWAYS, CONNECTION_ON_DEMAND])
+            schema[vol.Required(
+                CONF_IDLE_TIMEOUT,
+                default=options.get(CONF_IDLE_TIMEOUT, DEFAULT_IDLE_TIMEOUT),
+            )] = vol.All(vol.Coerce(float), vol.Range(min=5, max=3600))
+        schema.update({
+            vol.Required(
+                CONF_BACKOFF_BASE,
+                default=options.get(CONF_BACKOFF_BASE, DEFAULT_BACKOFF_BASE),
+            ): vol.All(vol.Coerce(float), vol.Range(min=1)),
+            vol.Required(
+                CONF_BACKOFF_MAX,
+                default=options.get(CONF_BACKOFF_MAX, DEFAULT_BACKOFF_MAX),
+            ): vol.All(vol.Coerce(float), vol.Range(min=1)),
+            vol.Required(
+                CONF_BREAKER_THRESHOLD,
+                default=options.get(CONF_BREAKER_THRESHOLD,
+                                    DEFAULT_BREAKER_THRESHOLD),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Required(
+                CONF_BREAKER_INTERVAL,
+                default=options.get(CONF_BREAKER_INTERVAL,
+                                    DEFAULT_BREAKER_INTERVAL),
+            ): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        })
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(schema))
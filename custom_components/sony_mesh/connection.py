@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from asyncio import CancelledError, Future, get_running_loop
+from heapq import heappop, heappush
+from itertools import count
+from random import uniform
+
+DEFAULT_BACKOFF_BASE = 5.0
+DEFAULT_BACKOFF_MAX = 300.0
+DEFAULT_BREAKER_INTERVAL = 1800.0
+DEFAULT_BREAKER_THRESHOLD = 10
+DEFAULT_CONNECT_SLOTS = 2
+
+
+class MESHBackoff:
+    failures = 0
+    last_error: str | None = None
+    retry_at = 0.0
+
+    def __init__(self, base=DEFAULT_BACKOFF_BASE, maximum=DEFAULT_BACKOFF_MAX, threshold=DEFAULT_BREAKER_THRESHOLD, interval=DEFAULT_BREAKER_INTERVAL):
+        self.base = base
+        self.maximum = maximum
+        self.threshold = threshold
+        self.interval = interval
+
+    @property
+    def tripped(self):
+        return self.failures >= self.threshold
+
+    def ready(self, now: float):
+        return now >= self.retry_at
+
+    def failure(self, now: float, error: str):
+        self.failures += 1
+        self.last_error = error
+        if self.tripped:
+            delay = self.interval
+        else:
+            delay = min(self.maximum, self.base * 2 ** (self.failures - 1))
+        self.retry_at = now + uniform(delay / 2, delay)
+
+    def success(self):
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+class MESHConnectScheduler:
+    def __init__(self, slots=DEFAULT_CONNECT_SLOTS):
+        self.slots = slots
+        self._active: dict[str, int] = {}
+        self._waiters: dict[str, list[tuple[int, int, Future[None]]]] = {}
+        self._seq = count()
+
+    def active(self, source: str):
+        return self._active.get(source, 0)
+
+    def waiting(self, source: str):
+        return sum(1 for x in self._waiters.get(source, ()) if not x[2].done())
+
+    async def acquire(self, source: str, priority: int):
+        if self._active.get(source, 0) < self.slots and not self.waiting(source):
+            self._active[source] = self._active.get(source, 0) + 1
+        else:
+            future = get_running_loop().create_future()
+            heappush(self._waiters.setdefault(source, []),
+                     (priority, next(self._seq), future))
+            try:
+                await future
+            except CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release(source)
+                raise
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self._release(source)
+        return release
+
+    def _release(self, source: str):
+        waiters = self._waiters.get(source)
+        while waiters:
+            _, _, future = heappop(waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._waiters.pop(source, None)
+        self._active[source] -= 1
+        if not self._active[source]:
+            del self._active[source]
@@ -0,0 +1,29 @@
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import MESHGP, MESHCore
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry):
+    core: MESHCore = hass.data[entry.entry_id]
+    diagnostics = {
+        "connection": {
+            "connected": core.client is not None,
+            "failures": core.backoff.failures,
+            "last_error": core.backoff.last_error,
+            "circuit_open": core.backoff.tripped,
+            "last_connected": core.last_connected,
+            "stale": core.stale,
+        },
+        "phases": core.phases.as_dict(),
+        "opcodes": {
+            f"{k[0]:02x}:{k[1]:02x}": v for k, v in core.dispatcher.counts.items()
+        },
+        "packets": core.packets.as_dict(),
+    }
+    if isinstance(core, MESHGP):
+        diagnostics["din"] = {
+            "pulses": core.pulses,
+            "bounces": core.bounces,
+        }
+    return diagnostics
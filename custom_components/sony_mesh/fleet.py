@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from asyncio import Semaphore, gather, wait_for
+from time import monotonic
+from typing import Any, Mapping
+
+import voluptuous as vol
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+
+DEFAULT_TIMEOUT = 5.0
+
+_LIGHT_ATTRIBUTES = ("brightness", "rgb_color")
+
+_NUMBER_TARGET = vol.Any(
+    vol.Coerce(float),
+    vol.Schema({vol.Required("value"): vol.Coerce(float)}),
+)
+_STATE_TARGET = vol.Any(
+    cv.boolean,
+    vol.Schema({
+        vol.Optional("state", default=True): cv.boolean,
+        vol.Optional("brightness"): vol.All(vol.Coerce(int), vol.Range(0, 255)),
+        vol.Optional("rgb_color"): vol.All(vol.ExactSequence((cv.byte,) * 3), vol.Coerce(tuple)),
+    }),
+)
+
+
+def scene_entities(value: Any) -> dict[str, Any]:
+    value = vol.Schema({cv.entity_id: object})(value)
+    return {
+        entity_id: (_NUMBER_TARGET if entity_id.startswith("number.") else _STATE_TARGET)(target)
+        for entity_id, target in value.items()
+    }
+
+
+async def async_apply_scene(hass: HomeAssistant, cores: dict, entities: Mapping[str, Any], slots: int, timeout=DEFAULT_TIMEOUT):
+    blocks: dict[Any, list] = {}
+    results: list[dict[str, Any]] = []
+    for entity_id, target in entities.items():
+        domain = entity_id.split(".", 1)[0]
+        component = hass.data.get(domain)
+        entity = component.get_entity(entity_id) if component else None
+        if getattr(entity, "core", None) not in cores.values():
+            results.append({
+                ATTR_ENTITY_ID: entity_id,
+                "success": False,
+                "latency": None,
+                "error": f"{entity_id} is not a MESH entity",
+            })
+            continue
+        blocks.setdefault(entity.core, []).append((domain, entity, target))
+
+    semaphores: dict[str | None, Semaphore] = {}
+
+    async def apply(core, targets: list):
+        if core.client is None:
+            semaphore = semaphores.setdefault(core.source, Semaphore(slots))
+            async with semaphore:
+                return await _apply_block(core, targets, timeout)
+        return await _apply_block(core, targets, timeout)
+
+    results.extend(await gather(*(
+        apply(core, targets) for core, targets in blocks.items()
+    )))
+    return results
+
+
+async def _apply_block(core, targets: list, timeout: float):
+    start = monotonic()
+    try:
+        for domain, entity, target in targets:
+            if not entity.available:
+                raise Exception(entity.entity_id + " is unavailable")
+        await wait_for(gather(*(
+            _apply(domain, entity, target)
+            for domain, entity, target in targets
+        )), timeout)
+    except Exception as ex:
+        error = str(ex) or type(ex).__name__
+    else:
+        error = None
+    return {
+        "name": core.name,
+        "entities": [x[1].entity_id for x in targets],
+        "success": error is None,
+        "latency": round(monotonic() - start, 3),
+        "error": error,
+    }
+
+
+async def _apply(domain: str, entity, target):
+    if domain == "number":
+        value = target["value"] if isinstance(target, Mapping) else target
+        if not entity.native_min_value <= value <= entity.native_max_value:
+            raise ValueError(
+                f"{value} is out of range for {entity.entity_id} "
+                f"({entity.native_min_value}-{entity.native_max_value})")
+        await entity.async_set_native_value(value)
+        return
+    if isinstance(target, Mapping):
+        state = target["state"]
+        attributes = {k: target[k] for k in _LIGHT_ATTRIBUTES if k in target}
+    else:
+        state = target
+        attributes = {}
+    if not state:
+        await entity.async_turn_off()
+    elif domain == "light":
+        await entity.async_turn_on(**attributes)
+    else:
+        await entity.async_turn_on()
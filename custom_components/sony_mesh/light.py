@@ -4,14 +4,14 @@ from struct import pack
 import voluptuous as vol
 from homeassistant.components.light import ColorMode, LightEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_NAME
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_platform, event, selector, service
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import MESHCore, MESHEntity
+from . import PRIORITY_LOW, MESHCore, MESHEntity, create_entities
 
 PATTERN_BLINK = "Blink"
 PATTERN_FIREFLY = "Firefly"
@@ -22,13 +22,21 @@ _LED_PATTERNS = {
 }
 
 
+_ENTITIES = {
+    "led": lambda core, name: [MESHLedEntity(core, name)],
+    "status_led": lambda core, name: [MESHStatusLedEntity(core, name)],
+}
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
     platform = entity_platform.async_get_current_platform()
     core: MESHCore = hass.data[entry.entry_id]
-    name: str = entry.data[CONF_NAME]
-    async_add_entities([
-        MESHStatusLedEntity(core, name),
-    ])
+    async_add_entities(create_entities(core, Platform.LIGHT, _ENTITIES))
+    for key in core.model.services:
+        _SERVICES[key](platform)
+
+
+def _register_status_services(platform: entity_platform.EntityPlatform):
     platform.async_register_entity_service("status_turn_on", vol.Schema({
         vol.Required("red"): cv.boolean,
         vol.Required("green"): cv.boolean,
@@ -36,17 +44,22 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     }), _service_status_turn_on)
     platform.async_register_entity_service(
         "status_turn_off", {}, _service_status_turn_off)
-    if name.startswith("MESH-100LE"):
-        async_add_entities([
-            MESHLedEntity(core, name),
-        ])
-        platform.async_register_entity_service("led_turn_on", vol.Schema({
-            vol.Required("color"): selector.ColorRGBSelector(),
-            vol.Optional("duration"): vol.Range(0, 0xFFFF),
-            vol.Optional("on_cycle"): vol.Range(0, 0xFFFF),
-            vol.Optional("off_cycle"): vol.Range(0, 0xFFFF),
-            vol.Optional("pattern"): vol.In(list(_LED_PATTERNS.keys())),
-        }), _service_led_turn_on)
+
+
+def _register_led_services(platform: entity_platform.EntityPlatform):
+    platform.async_register_entity_service("led_turn_on", vol.Schema({
+        vol.Required("color"): selector.ColorRGBSelector(),
+        vol.Optional("duration"): vol.Range(0, 0xFFFF),
+        vol.Optional("on_cycle"): vol.Range(0, 0xFFFF),
+        vol.Optional("off_cycle"): vol.Range(0, 0xFFFF),
+        vol.Optional("pattern"): vol.In(list(_LED_PATTERNS.keys())),
+    }), _service_led_turn_on)
+
+
+_SERVICES = {
+    "led": _register_led_services,
+    "status": _register_status_services,
+}
 
 
 class MESHLedEntity(MESHEntity, LightEntity):
@@ -132,12 +145,12 @@ class MESHStatusLedEntity(MESHEntity, LightEntity):
         self._attr_unique_id = f"{name}-status-led"
 
     async def async_turn_off(self, **kwargs):
-        await self.core.send(b"\x00\x04\x01\x05")
+        await self.core.send(b"\x00\x04\x01\x05", PRIORITY_LOW)
         self._attr_is_on = False
         self.async_write_ha_state()
 
     async def async_turn_on(self, **kwargs):
-        await self.core.send(b"\x00\x04\x00\x04")
+        await self.core.send(b"\x00\x04\x00\x04", PRIORITY_LOW)
         self._attr_is_on = True
         self.async_write_ha_state()
 
@@ -149,7 +162,7 @@ class MESHStatusLedEntity(MESHEntity, LightEntity):
 async def _service_status_turn_off(entity: MESHEntity, call: service.ServiceCall):
     if type(entity) is not MESHStatusLedEntity:
         return
-    await entity.core.send(b"\x00\x00\x00\x00\x00\x00\x00")
+    await entity.core.send(b"\x00\x00\x00\x00\x00\x00\x00", PRIORITY_LOW)
 
 
 async def _service_status_turn_on(entity: MESHEntity, call: service.ServiceCall):
@@ -163,7 +176,7 @@ async def _service_status_turn_on(entity: MESHEntity, call: service.ServiceCall)
         1 if call.data["green"] else 0,
         1 if call.data["blue"] else 0,
         1,
-    ))
+    ), PRIORITY_LOW)
 
 
 async def _service_led_turn_on(entity: MESHEntity, call: service.ServiceCall):
@@ -25,6 +25,14 @@ def async_describe_events(
             LOGBOOK_ENTRY_MESSAGE: MESSAGES[data["type"]],
         }
 
+    def sony_mesh_condition(event: Event):
+        data = event.data
+        key, direction = data["type"].rsplit("_", 1)
+        return {
+            LOGBOOK_ENTRY_NAME: data[CONF_NAME],
+            LOGBOOK_ENTRY_MESSAGE: f"{key} went {direction} the limit ({data['value']})",
+        }
+
     def sony_mesh_icon(event: Event):
         data = event.data
         return {
@@ -40,5 +48,6 @@ def async_describe_events(
         }
 
     async_describe_event(DOMAIN, "sony_mesh_button", sony_mesh_button)
+    async_describe_event(DOMAIN, "sony_mesh_condition", sony_mesh_condition)
     async_describe_event(DOMAIN, "sony_mesh_icon", sony_mesh_icon)
     async_describe_event(DOMAIN, "sony_mesh_move", sony_mesh_move)
@@ -1,26 +1,24 @@
 from homeassistant.components.number import NumberEntity, RestoreNumber
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import (CONF_NAME, ELECTRIC_POTENTIAL_VOLT,
-                                 TIME_MILLISECONDS)
+from homeassistant.const import (ELECTRIC_POTENTIAL_VOLT, TIME_MILLISECONDS,
+                                 Platform)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import MESHGP, MESHMD, MESHCore, MESHEntity
+from . import MESHGP, MESHMD, MESHCore, MESHEntity, create_entities
+
+
+_ENTITIES = {
+    "analog_output": lambda core, name: [MESHAnalogOutputEntity(core, name)],
+    "motion_delay": lambda core, name: [MESHMotionDelayEntity(core, name)],
+    "motion_hold": lambda core, name: [MESHMotionHoldEntity(core, name)],
+}
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
     core: MESHCore = hass.data[entry.entry_id]
-    name: str = entry.data[CONF_NAME]
-    if type(core) is MESHGP:
-        async_add_entities([
-            MESHAnalogOutputEntity(core, name),
-        ])
-    elif type(core) is MESHMD:
-        async_add_entities([
-            MESHMotionDelayEntity(core, name),
-            MESHMotionHoldEntity(core, name),
-        ])
+    async_add_entities(create_entities(core, Platform.NUMBER, _ENTITIES))
 
 
 class MESHAnalogOutputEntity(MESHEntity, NumberEntity):
@@ -41,7 +39,8 @@ class MESHAnalogOutputEntity(MESHEntity, NumberEntity):
     def native_value(self):
         return round(self.core.aout * 3.0 / 255, 2)
 
-    async def set_native_value(self, value: float):
+    async def async_set_native_value(self, value: float):
+        self.core.check_writable()
         self.core.aout = round(value * 255 / 3.0)
         await self.core.send_config()
         self.async_write_ha_state()
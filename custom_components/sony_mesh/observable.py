@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from asyncio import get_running_loop
+from typing import Callable, Generic, TypeVar
+
+K = TypeVar("K")
+T = TypeVar("T")
+
+
+class MESHEvent(Generic[T]):
+    __slots__ = ("_observers",)
+
+    def __init__(self):
+        self._observers: tuple[Callable[[T], None], ...] = ()
+
+    def subscribe(self, func: Callable[[T], None]) -> Callable[[], None]:
+        self._observers += (func,)
+
+        def dispose():
+            self._observers = tuple(
+                x for x in self._observers if x is not func)
+        return dispose
+
+    def on_next(self, value: T):
+        for func in self._observers:
+            func(value)
+
+    async def first(self, predicate: Callable[[T], bool]) -> T:
+        future = get_running_loop().create_future()
+
+        def check(value: T):
+            if not future.done() and predicate(value):
+                future.set_result(value)
+        dispose = self.subscribe(check)
+        try:
+            return await future
+        finally:
+            dispose()
+
+
+class MESHState(MESHEvent[T]):
+    __slots__ = ("value",)
+
+    def __init__(self, value: T):
+        super().__init__()
+        self.value = value
+
+    def subscribe(self, func: Callable[[T], None]) -> Callable[[], None]:
+        dispose = super().subscribe(func)
+        func(self.value)
+        return dispose
+
+    def on_next(self, value: T):
+        self.value = value
+        super().on_next(value)
+
+
+class MESHKeyedEvent(Generic[K, T]):
+    __slots__ = ("_handlers",)
+
+    def __init__(self):
+        self._handlers: dict[K, tuple[Callable[[T], None], ...]] = {}
+
+    def get(self, key: K) -> tuple[Callable[[T], None], ...]:
+        return self._handlers.get(key, ())
+
+    def subscribe(self, key: K, func: Callable[[T], None]) -> Callable[[], None]:
+        self._handlers[key] = self._handlers.get(key, ()) + (func,)
+
+        def dispose():
+            handlers = tuple(
+                x for x in self._handlers.get(key, ()) if x is not func)
+            if handlers:
+                self._handlers[key] = handlers
+            else:
+                self._handlers.pop(key, None)
+        return dispose
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from struct import Struct
+from typing import Mapping, NamedTuple
+
+
+class BatteryFrame(NamedTuple):
+    level: int
+
+    @property
+    def battery(self):
+        return self.level * 10
+
+
+class IconFrame(NamedTuple):
+    pass
+
+
+class StatusFrame(NamedTuple):
+    major: int
+    minor: int
+    release: int
+    level: int
+
+    @property
+    def battery(self):
+        return self.level * 10
+
+    @property
+    def version(self):
+        return f"{self.major}.{self.minor}.{self.release}"
+
+
+class ButtonFrame(NamedTuple):
+    push: int
+
+
+class FlipFrame(NamedTuple):
+    pass
+
+
+class OrientationFrame(NamedTuple):
+    face: int
+
+
+class GPIOFrame(NamedTuple):
+    pin: int
+    level: int
+
+    @property
+    def is_on(self):
+        return self.level == 1
+
+
+class GPIOEdgeFrame(NamedTuple):
+    pin: int
+    level: int
+
+    @property
+    def is_on(self):
+        return self.level == 0
+
+
+class AnalogFrame(NamedTuple):
+    level: int
+
+    @property
+    def voltage(self):
+        return round(self.level * 3.0 / 255, 2)
+
+
+class MotionFrame(NamedTuple):
+    state: int
+
+    @property
+    def is_on(self):
+        if self.state == 1:
+            return True
+        if self.state == 2:
+            return False
+        return None
+
+
+class PAFrame(NamedTuple):
+    proximity: int
+    level: int
+
+    @property
+    def illuminance(self):
+        return self.level * 10
+
+
+class THFrame(NamedTuple):
+    level: int
+    humidity: int
+
+    @property
+    def temperature(self):
+        return self.level / 10
+
+
+FrameTable = Mapping[tuple[int, int], tuple[Struct, type]]
+
+CORE_FRAMES: FrameTable = {
+    (0, 0): (Struct("<2xB"), BatteryFrame),
+    (0, 1): (Struct("<2x"), IconFrame),
+    (0, 2): (Struct("<7xBBB4xB"), StatusFrame),
+}
+
+AC_FRAMES: FrameTable = {
+    **CORE_FRAMES,
+    (1, 2): (Struct("<2x"), FlipFrame),
+    (1, 3): (Struct("<2xB"), OrientationFrame),
+}
+
+BU_FRAMES: FrameTable = {
+    **CORE_FRAMES,
+    (1, 0): (Struct("<2xB"), ButtonFrame),
+}
+
+GP_FRAMES: FrameTable = {
+    **CORE_FRAMES,
+    (1, 0): (Struct("<2xBB"), GPIOFrame),
+    (1, 1): (Struct("<5xB"), AnalogFrame),
+    (1, 2): (Struct("<3xBB"), GPIOEdgeFrame),
+    (1, 3): (Struct("<4xB"), AnalogFrame),
+}
+
+MD_FRAMES: FrameTable = {
+    **CORE_FRAMES,
+    (1, 0): (Struct("<3xB"), MotionFrame),
+}
+
+PA_FRAMES: FrameTable = {
+    **CORE_FRAMES,
+    (1, 0): (Struct("<4xHH"), PAFrame),
+}
+
+TH_FRAMES: FrameTable = {
+    **CORE_FRAMES,
+    (1, 0): (Struct("<4xhH"), THFrame),
+}
+
+
+def decode(frames: FrameTable, data: bytes | bytearray) -> tuple | None:
+    if len(data) < 3:
+        raise ValueError(f"Frame too short: {data.hex()}")
+    if (sum(data) - data[-1]) & 0xFF != data[-1]:
+        raise ValueError(f"Checksum mismatch: {data.hex()}")
+    layout = frames.get((data[0], data[1]))
+    if layout is None:
+        return None
+    if len(data) <= layout[0].size:
+        raise ValueError(f"Frame too short: {data.hex()}")
+    return layout[1]._make(layout[0].unpack_from(data))
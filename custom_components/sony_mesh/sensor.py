@@ -1,15 +1,27 @@
 from abc import abstractclassmethod
+from datetime import timedelta
+from time import monotonic
+from typing import Any, Callable, Mapping
 
 from homeassistant.components.sensor import (SensorDeviceClass, SensorEntity,
                                              SensorStateClass)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import (CONF_NAME, ELECTRIC_POTENTIAL_VOLT, LIGHT_LUX,
-                                 PERCENTAGE, TEMP_CELSIUS)
+from homeassistant.const import (ELECTRIC_POTENTIAL_VOLT, LIGHT_LUX,
+                                 PERCENTAGE, TEMP_CELSIUS, TIME_MILLISECONDS,
+                                 Platform)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import (async_call_later,
+                                         async_track_time_interval)
+from homeassistant.util import dt
 
-from . import MESHAC, MESHGP, MESHPA, MESHTH, MESHCore, MESHEntity
+from . import (CMD_AIN_READ, CONF_DEADBAND_MODE, CONF_HEARTBEAT,
+               CONF_MIN_INTERVAL, CONF_PULSE_INTERVAL, DEADBAND_PERCENT,
+               DEFAULT_HEARTBEAT, DEFAULT_PULSE_INTERVAL, MESHAC, MESHGP,
+               PRIORITY_LOW, MESHCore, MESHEntity, create_entities)
+from .protocol import AnalogFrame, OrientationFrame, PAFrame, THFrame
+from .stats import PHASES, WindowStats
 
 _ORIENTATIONS = {
     1: "left",
@@ -20,31 +32,30 @@ _ORIENTATIONS = {
     6: "right",
 }
 
+_ENTITIES = {
+    "ain": lambda core, name: [MESHAnalogInputEntity(core, name)],
+    "ain_window": lambda core, name: [
+        MESHAnalogWindowEntity(core, name, x)
+        for x in ("minimum", "maximum", "count")
+    ],
+    "battery": lambda core, name: [MESHBatteryEntity(core, name)],
+    "connect_failures": lambda core, name: [MESHConnectFailuresEntity(core, name)],
+    "humidity": lambda core, name: [MESHHumidityEntity(core, name)],
+    "illuminance": lambda core, name: [MESHIlluminanceEntity(core, name)],
+    "last_error": lambda core, name: [MESHLastErrorEntity(core, name)],
+    "orientation": lambda core, name: [MESHOrientationEntity(core, name)],
+    "phases": lambda core, name: [MESHPhaseEntity(core, name, x) for x in PHASES],
+    "pulses": lambda core, name: [
+        MESHPulseCountEntity(core, name, x) for x in (1, 2, 3)
+    ],
+    "proximity": lambda core, name: [MESHProximityEntity(core, name)],
+    "temperature": lambda core, name: [MESHTempertureEntity(core, name)],
+}
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
     core: MESHCore = hass.data[entry.entry_id]
-    name: str = entry.data[CONF_NAME]
-    async_add_entities([
-        MESHBatteryEntity(core, name),
-    ])
-    if type(core) is MESHAC:
-        async_add_entities([
-            MESHOrientationEntity(core, name),
-        ])
-    elif type(core) is MESHGP:
-        async_add_entities([
-            MESHAnalogInputEntity(core, name),
-        ])
-    elif type(core) is MESHPA:
-        async_add_entities([
-            MESHIlluminanceEntity(core, name),
-            MESHProximityEntity(core, name),
-        ])
-    elif type(core) is MESHTH:
-        async_add_entities([
-            MESHHumidityEntity(core, name),
-            MESHTempertureEntity(core, name),
-        ])
+    async_add_entities(create_entities(core, Platform.SENSOR, _ENTITIES))
 
 
 class MESHBatteryEntity(MESHEntity, SensorEntity):
@@ -62,31 +73,213 @@ class MESHBatteryEntity(MESHEntity, SensorEntity):
         await super().async_added_to_hass()
         self._subscribe(self.core.battery, self.__battery_changed)
 
-    def __battery_changed(self, value: int):
+    def _connect_changed(self, connected: bool):
+        pass
+
+    def __battery_changed(self, value: int | None):
+        self._attr_available = value is not None
+        self._attr_native_value = value
+        self._attr_extra_state_attributes = {
+            "stale": self.core.stale,
+            "last_connected": self.core.last_connected,
+        }
+        self.async_write_ha_state()
+
+
+class MESHConnectFailuresEntity(MESHEntity, SensorEntity):
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:lan-disconnect"
+    _attr_name = "Connect failures"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, core: MESHCore, name: str):
+        super().__init__(core)
+        self._attr_unique_id = f"{name}-connect-failures"
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._subscribe(self.core.failures, self.__failures_changed)
+
+    def _connect_changed(self, connected: bool):
+        pass
+
+    def __failures_changed(self, value: int):
+        backoff = self.core.backoff
+        delay = backoff.retry_at - self.hass.loop.time()
         self._attr_native_value = value
+        self._attr_extra_state_attributes = {
+            "circuit_open": backoff.tripped,
+            "retry_at": dt.utcnow() + timedelta(seconds=delay) if delay > 0 else None,
+        }
+        self.async_write_ha_state()
+
+
+class MESHLastErrorEntity(MESHEntity, SensorEntity):
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:alert-circle-outline"
+    _attr_name = "Last error"
+
+    def __init__(self, core: MESHCore, name: str):
+        super().__init__(core)
+        self._attr_unique_id = f"{name}-last-error"
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._subscribe(self.core.failures, self.__failures_changed)
+
+    def _connect_changed(self, connected: bool):
+        pass
+
+    def __failures_changed(self, value: int):
+        if error := self.core.backoff.last_error:
+            self._attr_native_value = error[:255]
+        self.async_write_ha_state()
+
+
+class MESHPhaseEntity(MESHEntity, SensorEntity):
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:timer-outline"
+    _attr_native_unit_of_measurement = TIME_MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, core: MESHCore, name: str, phase: str):
+        super().__init__(core)
+        self.phase = phase
+        self._attr_name = f"Connect {phase} time"
+        self._attr_unique_id = f"{name}-phase-{phase}"
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._subscribe(self.core.phase_changed, self.__phase_changed)
+
+    def _connect_changed(self, connected: bool):
+        pass
+
+    def __phase_changed(self, phase: str):
+        if phase != self.phase:
+            return
+        stats = self.core.phases.phases[phase]
+        self._attr_native_value = stats.last
+        self._attr_extra_state_attributes = {
+            "p50": stats.percentile(0.5),
+            "p95": stats.percentile(0.95),
+            "failures": stats.failures,
+        }
         self.async_write_ha_state()
 
 
 class MESHSensorEntity(MESHEntity, SensorEntity):
+    _opcodes: tuple[tuple[int, ...], ...] = ()
+
     async def async_added_to_hass(self):
         await super().async_added_to_hass()
-        self._subscribe(self.core.received, self._received)
+        for opcode in self._opcodes:
+            self._listen(opcode, self._received)
 
     def _connect_changed(self, connected: bool):
         self._attr_native_value = None
         super()._connect_changed(connected)
 
     @abstractclassmethod
-    def _received(self, data: bytes):
+    def _received(self, frame: tuple):
         ...
 
 
-class MESHAnalogInputEntity(MESHSensorEntity):
+class MESHMeasurementEntity(MESHSensorEntity):
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _deadband_key: str
+    _deadband = 0.0
+    _deadband_percent = False
+    _min_interval = 0.0
+    _written: float | None = None
+    _written_at = 0.0
+    __delayed: Callable[[], None] | None = None
+    __heartbeat: Callable[[], None] | None = None
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._subscribe(self.core.options, self.__options_changed)
+        self.async_on_remove(self.__cancel)
+
+    def _connect_changed(self, connected: bool):
+        self._written = None
+        super()._connect_changed(connected)
+
+    def _write_value(self, value: float):
+        self._attr_native_value = value
+        if self._written is not None and not self.__exceeds(value):
+            return
+        if self.__delayed is not None:
+            return
+        delay = self._written_at + self._min_interval - monotonic()
+        if delay > 0:
+            self.__delayed = async_call_later(
+                self.hass, delay, self.__delayed_write)
+            return
+        self.__write()
+
+    def __exceeds(self, value: float):
+        last = self._written
+        if last is None:
+            return True
+        if self._deadband_percent:
+            threshold = abs(last) * self._deadband / 100
+        else:
+            threshold = self._deadband
+        if not threshold:
+            return value != last
+        return abs(value - last) > threshold
+
+    def __write(self):
+        self._written = self._attr_native_value
+        self._written_at = monotonic()
+        self.async_write_ha_state()
+
+    def __delayed_write(self, *args):
+        self.__delayed = None
+        value = self._attr_native_value
+        if value is not None and self.__exceeds(value):
+            self.__write()
+
+    def __heartbeat_write(self, *args):
+        if self._attr_native_value is None or self._attr_native_value == self._written:
+            return
+        if self.__delayed is not None:
+            self.__delayed()
+            self.__delayed = None
+        self.__write()
+
+    def __options_changed(self, options: Mapping[str, Any]):
+        self._deadband = options.get(f"deadband_{self._deadband_key}", 0.0)
+        self._deadband_percent = options.get(
+            CONF_DEADBAND_MODE) == DEADBAND_PERCENT
+        self._min_interval = options.get(CONF_MIN_INTERVAL, 0.0)
+        if self.__heartbeat is not None:
+            self.__heartbeat()
+            self.__heartbeat = None
+        if heartbeat := options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT):
+            self.__heartbeat = async_track_time_interval(
+                self.hass, self.__heartbeat_write, timedelta(seconds=heartbeat))
+
+    def __cancel(self):
+        if self.__delayed is not None:
+            self.__delayed()
+            self.__delayed = None
+        if self.__heartbeat is not None:
+            self.__heartbeat()
+            self.__heartbeat = None
+
+
+class MESHAnalogInputEntity(MESHMeasurementEntity):
     core: MESHGP
     _attr_device_class = SensorDeviceClass.VOLTAGE
     _attr_name = "AIN"
     _attr_native_unit_of_measurement = ELECTRIC_POTENTIAL_VOLT
-    _attr_state_class = SensorStateClass.MEASUREMENT
+    _deadband_key = "ain"
+    _opcodes = ((1, 1), (1, 3))
 
     def __init__(self, core: MESHGP, name: str):
         super().__init__(core)
@@ -95,6 +288,7 @@ class MESHAnalogInputEntity(MESHSensorEntity):
     async def async_added_to_hass(self):
         await super().async_added_to_hass()
         self.core.ain = True
+        self._subscribe(self.core.ain_stats, self.__stats_received)
 
     async def async_will_remove_from_hass(self):
         await super().async_will_remove_from_hass()
@@ -103,99 +297,174 @@ class MESHAnalogInputEntity(MESHSensorEntity):
     def _connect_changed(self, connected: bool):
         if connected:
             self.hass.loop.create_task(
-                self.core.send(b"\x01\x03\x00\x01\x05"))
+                self.core.send(CMD_AIN_READ, PRIORITY_LOW))
         if self._attr_available:
             self._attr_available = False
             self.async_write_ha_state()
 
-    def _received(self, data: bytes):
-        if data[:2] == b"\x01\x01":
-            self._attr_native_value = round(data[5] * 3.0 / 255, 2)
-        elif data[:2] == b"\x01\x03":
-            self._attr_native_value = round(data[4] * 3.0 / 255, 2)
-        else:
+    def _received(self, frame: AnalogFrame):
+        if not self._attr_available:
+            self._attr_available = True
+            self._written = None
+        elif self.core.ain_interval:
             return
+        self._write_value(frame.voltage)
+
+    def __stats_received(self, stats: WindowStats):
+        self._attr_native_value = stats.mean
         self._attr_available = True
         self.async_write_ha_state()
 
 
-class MESHHumidityEntity(MESHSensorEntity):
+class MESHAnalogWindowEntity(MESHEntity, SensorEntity):
+    core: MESHGP
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, core: MESHGP, name: str, stat: str):
+        super().__init__(core)
+        self.stat = stat
+        self._attr_name = f"AIN {stat}"
+        self._attr_unique_id = f"{name}-ain-{stat}"
+        if stat != "count":
+            self._attr_device_class = SensorDeviceClass.VOLTAGE
+            self._attr_native_unit_of_measurement = ELECTRIC_POTENTIAL_VOLT
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._subscribe(self.core.ain_stats, self.__stats_received)
+
+    def _connect_changed(self, connected: bool):
+        self._attr_native_value = None
+        super()._connect_changed(connected)
+
+    def __stats_received(self, stats: WindowStats):
+        self._attr_native_value = getattr(stats, self.stat)
+        self.async_write_ha_state()
+
+
+class MESHHumidityEntity(MESHMeasurementEntity):
     _attr_device_class = SensorDeviceClass.HUMIDITY
     _attr_name = "Humidity"
     _attr_native_unit_of_measurement = PERCENTAGE
-    _attr_state_class = SensorStateClass.MEASUREMENT
+    _deadband_key = "humidity"
+    _opcodes = ((1, 0),)
 
-    def __init__(self, core: MESHTH, name: str):
+    def __init__(self, core: MESHCore, name: str):
         super().__init__(core)
         self._attr_unique_id = f"{name}-humidity"
 
-    def _received(self, data: bytes):
-        if data[:2] != b"\x01\x00":
-            return
-        self._attr_native_value = int.from_bytes(data[6:8], "little")
-        self.async_write_ha_state()
+    def _received(self, frame: THFrame):
+        self._write_value(frame.humidity)
 
 
-class MESHIlluminanceEntity(MESHSensorEntity):
+class MESHIlluminanceEntity(MESHMeasurementEntity):
     _attr_device_class = SensorDeviceClass.ILLUMINANCE
     _attr_name = "Illuminance"
     _attr_native_unit_of_measurement = LIGHT_LUX
-    _attr_state_class = SensorStateClass.MEASUREMENT
+    _deadband_key = "illuminance"
+    _opcodes = ((1, 0),)
 
-    def __init__(self, core: MESHPA, name: str):
+    def __init__(self, core: MESHCore, name: str):
         super().__init__(core)
         self._attr_unique_id = f"{name}-illuminance"
 
-    def _received(self, data: bytes):
-        if data[:2] != b"\x01\x00":
-            return
-        self._attr_native_value = int.from_bytes(data[6:8], "little") * 10
-        self.async_write_ha_state()
+    def _received(self, frame: PAFrame):
+        self._write_value(frame.illuminance)
 
 
 class MESHOrientationEntity(MESHSensorEntity):
     _attr_name = "Orientation"
     _attr_device_class = "sony_mesh__orientation"
+    _opcodes = ((1, 3),)
 
     def __init__(self, core: MESHAC, name: str):
         super().__init__(core)
         self._attr_unique_id = f"{name}-orientation"
 
-    def _received(self, data: bytes):
-        if data[:2] != b"\x01\x03":
+    def _received(self, frame: OrientationFrame):
+        self._attr_native_value = _ORIENTATIONS.get(frame.face)
+        self.async_write_ha_state()
+
+
+class MESHPulseCountEntity(MESHEntity, SensorEntity):
+    core: MESHGP
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:pulse"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    __bounces = 0
+    __cancel: Callable[[], None] | None = None
+    __flushed: int | None = None
+
+    def __init__(self, core: MESHGP, name: str, pin: int):
+        super().__init__(core)
+        self.pin = pin
+        self._attr_name = f"DIN{pin} pulses"
+        self._attr_unique_id = f"{name}-din{pin}-pulses"
+
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        self._subscribe(self.core.options, self.__options_changed)
+        self.async_on_remove(self.__stop)
+
+    def _connect_changed(self, connected: bool):
+        pass
+
+    def __options_changed(self, options: Mapping[str, Any]):
+        self.__stop()
+        self.__interval = options.get(
+            CONF_PULSE_INTERVAL, DEFAULT_PULSE_INTERVAL)
+        self.__cancel = async_track_time_interval(
+            self.hass, self.__flush, timedelta(seconds=self.__interval))
+
+    def __flush(self, *args):
+        count = self.core.pulses[self.pin - 1]
+        bounces = self.core.bounces[self.pin - 1]
+        if count == self.__flushed and bounces == self.__bounces:
             return
-        self._attr_native_value = _ORIENTATIONS.get(data[2])
+        previous = self.__flushed or 0
+        self.__flushed = count
+        self.__bounces = bounces
+        edge_at = self.core.edge_at[self.pin - 1]
+        self._attr_native_value = count
+        self._attr_extra_state_attributes = {
+            "pulses_per_minute": round((count - previous) * 60 / self.__interval, 2),
+            "bounces": bounces,
+            "last_edge": None if edge_at is None else dt.utcnow() - timedelta(
+                seconds=self.hass.loop.time() - edge_at),
+        }
         self.async_write_ha_state()
 
+    def __stop(self):
+        if self.__cancel is not None:
+            self.__cancel()
+            self.__cancel = None
+
 
-class MESHProximityEntity(MESHSensorEntity):
+class MESHProximityEntity(MESHMeasurementEntity):
     _attr_name = "Proximity"
-    _attr_state_class = SensorStateClass.MEASUREMENT
+    _deadband_key = "proximity"
+    _opcodes = ((1, 0),)
 
-    def __init__(self, core: MESHPA, name: str):
+    def __init__(self, core: MESHCore, name: str):
         super().__init__(core)
         self._attr_unique_id = f"{name}-proximity"
 
-    def _received(self, data: bytes):
-        if data[:2] != b"\x01\x00":
-            return
-        self._attr_native_value = int.from_bytes(data[4:6], "little")
-        self.async_write_ha_state()
+    def _received(self, frame: PAFrame):
+        self._write_value(frame.proximity)
 
 
-class MESHTempertureEntity(MESHSensorEntity):
+class MESHTempertureEntity(MESHMeasurementEntity):
     _attr_device_class = SensorDeviceClass.TEMPERATURE
     _attr_name = "Temperture"
     _attr_native_unit_of_measurement = TEMP_CELSIUS
-    _attr_state_class = SensorStateClass.MEASUREMENT
+    _deadband_key = "temperature"
+    _opcodes = ((1, 0),)
 
-    def __init__(self, core: MESHTH, name: str):
+    def __init__(self, core: MESHCore, name: str):
         super().__init__(core)
         self._attr_unique_id = f"{name}-temperture"
 
-    def _received(self, data: bytes):
-        if data[:2] != b"\x01\x00":
-            return
-        self._attr_native_value = int.from_bytes(
-            data[4:6], "little", signed=True) / 10
-        self.async_write_ha_state()
+    def _received(self, frame: THFrame):
+        self._write_value(frame.temperature)
+
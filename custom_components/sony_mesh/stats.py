@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from time import monotonic
+from typing import Callable, NamedTuple
+
+PHASES = (
+    "slot",
+    "connect",
+    "indicate",
+    "info",
+    "notify",
+    "feature",
+    "configure",
+    "total",
+)
+
+DEFAULT_PACKETS = 128
+DEFAULT_SAMPLES = 50
+DEFAULT_WINDOW = 1024
+
+DIRECTION_RX = 0
+DIRECTION_TX = 1
+
+
+class MESHPhaseStats:
+    count = 0
+    failures = 0
+    last: float | None = None
+
+    def __init__(self, size=DEFAULT_SAMPLES):
+        self.samples = deque[float](maxlen=size)
+
+    def add(self, value: float):
+        self.count += 1
+        self.last = value
+        self.samples.append(value)
+
+    def percentile(self, p: float):
+        if not self.samples:
+            return None
+        values = sorted(self.samples)
+        return values[min(len(values) - 1, int(len(values) * p))]
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "last": self.last,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+        }
+
+
+class MESHPhaseTimer:
+    def __init__(self, on_update: Callable[[str], None] | None = None, size=DEFAULT_SAMPLES):
+        self.phases = {x: MESHPhaseStats(size) for x in PHASES}
+        self._on_update = on_update
+
+    @contextmanager
+    def measure(self, phase: str):
+        stats = self.phases[phase]
+        start = monotonic()
+        try:
+            yield
+        except Exception:
+            stats.failures += 1
+            self._notify(phase)
+            raise
+        stats.add(round((monotonic() - start) * 1000, 1))
+        self._notify(phase)
+
+    def as_dict(self):
+        return {k: v.as_dict() for k, v in self.phases.items()}
+
+    def _notify(self, phase: str):
+        if self._on_update is not None:
+            self._on_update(phase)
+
+
+class MESHPacketLog:
+    malformed = 0
+    received = 0
+    received_bytes = 0
+    sent = 0
+    sent_bytes = 0
+    write_errors = 0
+
+    def __init__(self, size=DEFAULT_PACKETS):
+        self.size = size
+        self.started = monotonic()
+        self._directions = bytearray(size)
+        self._packets: list[bytes | bytearray | None] = [None] * size
+        self._times = array("d", bytes(8 * size))
+        self._index = 0
+
+    def record(self, direction: int, data: bytes | bytearray):
+        i = self._index
+        self._times[i] = monotonic()
+        self._directions[i] = direction
+        self._packets[i] = data
+        self._index = i + 1 if i + 1 < self.size else 0
+        if direction == DIRECTION_RX:
+            self.received += 1
+            self.received_bytes += len(data)
+        else:
+            self.sent += 1
+            self.sent_bytes += len(data)
+
+    def packets(self):
+        now = monotonic()
+        for i in range(self._index - self.size, self._index):
+            data = self._packets[i]
+            if data is None:
+                continue
+            yield (
+                round(now - self._times[i], 3),
+                "rx" if self._directions[i] == DIRECTION_RX else "tx",
+                data.hex(),
+            )
+
+    def rate(self):
+        times = [self._times[i] for i in range(self.size)
+                 if self._packets[i] is not None and self._directions[i] == DIRECTION_RX]
+        if len(times) < 2:
+            return 0.0
+        span = monotonic() - min(times)
+        return round(len(times) / span, 2) if span > 0 else 0.0
+
+    def as_dict(self):
+        elapsed = monotonic() - self.started
+        return {
+            "received": self.received,
+            "received_bytes": self.received_bytes,
+            "sent": self.sent,
+            "sent_bytes": self.sent_bytes,
+            "malformed": self.malformed,
+            "write_errors": self.write_errors,
+            "packets_per_second": round(self.received / elapsed, 3) if elapsed > 0 else 0.0,
+            "recent_packets_per_second": self.rate(),
+            "packets": [
+                {"age": age, "direction": direction, "data": data}
+                for age, direction, data in self.packets()
+            ],
+        }
+
+
+class WindowStats(NamedTuple):
+    mean: float
+    minimum: float
+    maximum: float
+    count: int
+
+
+class MESHSampleWindow:
+    dropped = 0
+
+    def __init__(self, size=DEFAULT_WINDOW):
+        self.size = size
+        self._values = array("d", bytes(8 * size))
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, value: float):
+        if self._count < self.size:
+            self._values[self._count] = value
+            self._count += 1
+        else:
+            self.dropped += 1
+
+    def flush(self):
+        count = self._count
+        if not count:
+            return None
+        self._count = 0
+        values = memoryview(self._values)[:count]
+        return WindowStats(
+            round(sum(values) / count, 3),
+            min(values),
+            max(values),
+            count,
+        )
@@ -1,26 +1,25 @@
 from homeassistant.components.switch import SwitchDeviceClass, SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_NAME
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from . import MESHGP, MESHCore, MESHEntity
+from . import MESHGP, MESHCore, MESHEntity, create_entities
+
+
+_ENTITIES = {
+    "dout": lambda core, name: [
+        MESHDigitalOutputEntity(core, name, x) for x in (1, 2, 3)
+    ],
+    "power": lambda core, name: [MESHPowerEntity(core, name)],
+    "power_output": lambda core, name: [MESHPowerOutputEntity(core, name)],
+}
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
     core: MESHCore = hass.data[entry.entry_id]
-    name: str = entry.data[CONF_NAME]
-    async_add_entities([
-        MESHPowerEntity(core, name),
-    ])
-    if type(core) is MESHGP:
-        async_add_entities([
-            MESHDigitalOutputEntity(core, name, 1),
-            MESHDigitalOutputEntity(core, name, 2),
-            MESHDigitalOutputEntity(core, name, 3),
-            MESHPowerOutputEntity(core, name),
-        ])
+    async_add_entities(create_entities(core, Platform.SWITCH, _ENTITIES))
 
 
 class MESHOutputEntity(MESHEntity, SwitchEntity):
@@ -38,15 +37,17 @@ class MESHDigitalOutputEntity(MESHOutputEntity):
 
     @property
     def is_on(self):
-        return self.core.dout[self.pin]
+        return self.core.dout[self.pin - 1]
 
     async def async_turn_off(self, **kwargs):
-        self.core.dout[self.pin] = False
+        self.core.check_writable()
+        self.core.dout[self.pin - 1] = False
         await self.core.send_config()
         self.async_write_ha_state()
 
     async def async_turn_on(self, **kwargs):
-        self.core.dout[self.pin] = True
+        self.core.check_writable()
+        self.core.dout[self.pin - 1] = True
         await self.core.send_config()
         self.async_write_ha_state()
 
@@ -63,11 +64,13 @@ class MESHPowerOutputEntity(MESHOutputEntity):
         return self.core.power
 
     async def async_turn_off(self, **kwargs):
+        self.core.check_writable()
         self.core.power = False
         await self.core.send_config()
         self.async_write_ha_state()
 
     async def async_turn_on(self, **kwargs):
+        self.core.check_writable()
         self.core.power = True
         await self.core.send_config()
         self.async_write_ha_state()
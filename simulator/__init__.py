@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from .blocks import (BLOCKS, SimAC, SimBlock, SimBU, SimGP, SimLE, SimMD,
+                     SimPA, SimTH, add_checksum, create_block)
+from .client import Faults, SimClient, Simulator
+
+
+def service_info(block: SimBlock, source="simulator"):
+    return SimpleNamespace(
+        address=block.address,
+        connectable=True,
+        device=SimpleNamespace(address=block.address, name=block.name),
+        name=block.name,
+        source=source,
+    )
+
+
+def install(core_class, simulator: Simulator):
+    core_class.client_class = simulator.client_class()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from random import Random
+from struct import pack
+from typing import Callable
+
+INDICATE = 0
+NOTIFY = 1
+
+
+def add_checksum(data: bytes):
+    return data + bytes([sum(data) & 0xFF])
+
+
+class SimBlock:
+    code = ""
+    firmware = (1, 2, 5)
+    interval = 1.0
+
+    def __init__(self, name: str, interval: float | None = None, seed: int | None = None):
+        self.name = name
+        self.address = name
+        self.battery = 10
+        self.random = Random(seed)
+        self.writes: list[bytes] = []
+        self.enabled = False
+        if interval is not None:
+            self.interval = interval
+        self.emit: Callable[[int, bytes], None] = lambda channel, data: None
+
+    def connected(self):
+        self.enabled = False
+        self.emit(INDICATE, add_checksum(pack(
+            "<BBBIBBBBBBBB", 0, 2, 0, 0, *self.firmware, 0, 0, 0, 0, self.battery)))
+
+    def write(self, data: bytes):
+        self.writes.append(data)
+        if sum(data[:-1]) & 0xFF != data[-1]:
+            return
+        if data[:4] == b"\x00\x02\x01\x03":
+            self.enabled = True
+        elif data[0] == 1:
+            self.command(data[:-1])
+
+    def command(self, data: bytes):
+        pass
+
+    def tick(self):
+        if self.random.random() < 0.01:
+            self.battery = max(0, self.battery - 1)
+            self.emit(NOTIFY, add_checksum(pack("<BBB", 0, 0, self.battery)))
+
+    def press_icon(self):
+        self.emit(NOTIFY, add_checksum(b"\x00\x01"))
+
+
+class SimAC(SimBlock):
+    code = "AC"
+
+    def tick(self):
+        super().tick()
+        if self.random.random() < 0.2:
+            self.emit(NOTIFY, add_checksum(b"\x01\x02"))
+        else:
+            self.emit(NOTIFY, add_checksum(pack(
+                "<BBBBhhh", 1, 3, self.random.randint(1, 6), 0,
+                self.random.randint(-1024, 1024),
+                self.random.randint(-1024, 1024),
+                self.random.randint(-1024, 1024))))
+
+
+class SimBU(SimBlock):
+    code = "BU"
+
+    def tick(self):
+        super().tick()
+        self.emit(NOTIFY, add_checksum(
+            pack("<BBB", 1, 0, self.random.choice((1, 2, 3)))))
+
+
+class SimGP(SimBlock):
+    code = "GP"
+
+    def __init__(self, name: str, interval: float | None = None, seed: int | None = None):
+        super().__init__(name, interval, seed)
+        self.config = b""
+        self.din = [False, False, False]
+        self.ain = 0
+
+    def command(self, data: bytes):
+        if data[1] == 1:
+            self.config = data
+        elif data[1] == 0 and data[2] == 2 and len(data) >= 7:
+            pin = data[6]
+            self.emit(NOTIFY, add_checksum(
+                pack("<BBBB", 1, 0, pin, 1 if self.din[pin] else 0)))
+        elif data[1] == 3:
+            self.emit(NOTIFY, add_checksum(pack("<BBBBB", 1, 3, 0, 1, self.ain)))
+
+    def tick(self):
+        super().tick()
+        if self.random.random() < 0.5:
+            pin = self.random.randrange(3)
+            self.din[pin] = not self.din[pin]
+            self.emit(NOTIFY, add_checksum(
+                pack("<BBBBB", 1, 2, 0, pin, 0 if self.din[pin] else 1)))
+        else:
+            self.ain = self.random.randrange(256)
+            self.emit(NOTIFY, add_checksum(
+                pack("<BBBBBB", 1, 1, 0, 0, 0, self.ain)))
+
+
+class SimLE(SimBlock):
+    code = "LE"
+
+
+class SimMD(SimBlock):
+    code = "MD"
+
+    def __init__(self, name: str, interval: float | None = None, seed: int | None = None):
+        super().__init__(name, interval, seed)
+        self.config = b""
+
+    def command(self, data: bytes):
+        if data[1] == 0:
+            self.config = data
+
+    def tick(self):
+        super().tick()
+        if self.config:
+            self.emit(NOTIFY, add_checksum(
+                pack("<BBBB", 1, 0, 0, self.random.choice((1, 2)))))
+
+
+class SimPA(SimBlock):
+    code = "PA"
+
+    def __init__(self, name: str, interval: float | None = None, seed: int | None = None):
+        super().__init__(name, interval, seed)
+        self.config = b""
+
+    def command(self, data: bytes):
+        if data[1] == 0:
+            self.config = data
+
+    def tick(self):
+        super().tick()
+        if self.config:
+            self.emit(NOTIFY, add_checksum(pack(
+                "<BBBBHH", 1, 0, 0, 0,
+                self.random.randrange(0, 1024), self.random.randrange(0, 2000))))
+
+
+class SimTH(SimBlock):
+    code = "TH"
+
+    def __init__(self, name: str, interval: float | None = None, seed: int | None = None):
+        super().__init__(name, interval, seed)
+        self.config = b""
+
+    def command(self, data: bytes):
+        if data[1] == 0:
+            self.config = data
+
+    def tick(self):
+        super().tick()
+        if self.config:
+            self.emit(NOTIFY, add_checksum(pack(
+                "<BBBBhH", 1, 0, 0, 0,
+                self.random.randrange(-100, 400), self.random.randrange(0, 100))))
+
+
+BLOCKS: dict[str, type[SimBlock]] = {
+    x.code: x for x in (SimAC, SimBU, SimGP, SimLE, SimMD, SimPA, SimTH)
+}
+
+
+def create_block(name: str, interval: float | None = None, seed: int | None = None):
+    return BLOCKS.get(name[8:10], SimBlock)(name, interval, seed)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from asyncio import Task, create_task, get_running_loop, sleep
+from dataclasses import dataclass
+from random import Random
+from typing import Callable
+
+from .blocks import INDICATE, NOTIFY, SimBlock
+
+CORE_INDICATE_UUID = '72c90005-57a9-4d40-b746-534e22ec9f9e'
+CORE_NOTIFY_UUID = '72c90003-57a9-4d40-b746-534e22ec9f9e'
+
+
+@dataclass
+class Faults:
+    latency: float = 0.0
+    drop: float = 0.0
+    disconnect: float = 0.0
+    connect_failure: float = 0.0
+
+
+class SimClient:
+    simulator: Simulator
+    __task: Task | None = None
+
+    def __init__(self, device, disconnected_callback: Callable | None = None, **kwargs):
+        self.block = self.simulator.blocks[device.address]
+        self.faults = self.simulator.faults
+        self.random = self.simulator.random
+        self.is_connected = False
+        self._callbacks: dict[int, Callable] = {}
+        self._disconnected_callback = disconnected_callback
+
+    def set_disconnected_callback(self, callback: Callable | None, **kwargs):
+        self._disconnected_callback = callback
+
+    async def connect(self, **kwargs):
+        await sleep(self.faults.latency)
+        if self.random.random() < self.faults.connect_failure:
+            raise TimeoutError(f"{self.block.name} connect timed out")
+        self.is_connected = True
+        self.block.emit = self._emit
+        self.__task = create_task(self.__run())
+        return True
+
+    async def disconnect(self):
+        if not self.is_connected:
+            return True
+        self._drop()
+        return True
+
+    async def start_notify(self, uuid: str, callback: Callable, **kwargs):
+        self._check()
+        await sleep(self.faults.latency)
+        if uuid == CORE_INDICATE_UUID:
+            self._callbacks[INDICATE] = callback
+            self.block.connected()
+        elif uuid == CORE_NOTIFY_UUID:
+            self._callbacks[NOTIFY] = callback
+
+    async def write_gatt_char(self, uuid: str, data: bytes, response=False):
+        self._check()
+        await sleep(self.faults.latency)
+        self._check()
+        self.block.write(bytes(data))
+
+    def _check(self):
+        if not self.is_connected:
+            raise ConnectionError(f"{self.block.name} is not connected")
+
+    def _emit(self, channel: int, data: bytes):
+        if not self.is_connected:
+            return
+        if channel == NOTIFY and not self.block.enabled:
+            return
+        if self.random.random() < self.faults.drop:
+            return
+        if callback := self._callbacks.get(channel):
+            if self.faults.latency:
+                get_running_loop().call_later(
+                    self.faults.latency, callback, None, bytearray(data))
+            else:
+                callback(None, bytearray(data))
+
+    def _drop(self):
+        self.is_connected = False
+        self.block.emit = lambda channel, data: None
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+        if self._disconnected_callback is not None:
+            self._disconnected_callback(self)
+
+    async def __run(self):
+        while self.is_connected:
+            await sleep(self.block.interval)
+            if self.random.random() < self.faults.disconnect:
+                self._drop()
+                return
+            if self.block.enabled:
+                self.block.tick()
+
+
+class Simulator:
+    def __init__(self, blocks: list[SimBlock] | None = None, faults: Faults | None = None, seed: int | None = None):
+        self.blocks = {x.address: x for x in blocks or ()}
+        self.faults = faults or Faults()
+        self.random = Random(seed)
+
+    def add(self, block: SimBlock):
+        self.blocks[block.address] = block
+        return block
+
+    def client_class(self) -> type[SimClient]:
+        return type("SimClient", (SimClient,), {"simulator": self})